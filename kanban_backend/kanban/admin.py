@@ -1,6 +1,83 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Label, Task, Comment, Attachment, ActivityLog
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404, HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils.functional import cached_property
+from . import profiling
+from .models import CustomUser, Board, BoardMembership, Label, Task, Comment, Attachment, ActivityLog
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts PostgreSQL's row estimate (pg_class.reltuples) for
+    unfiltered changelists instead of running COUNT(*) over the whole table.
+    Filtered querysets, small tables and other databases are counted exactly.
+    """
+    exact_below = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.exact_below:
+                return row[0]
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist defaults for tables that grow without bound: estimated
+    pagination, no second "N total" COUNT(*), and searches that stay on
+    indexes. A numeric search term is looked up by id in `id_search_fields`;
+    anything else goes through `search_fields`, which should only use
+    prefix (``^``) lookups on columns with a matching case-insensitive index
+    (migrations 0008 and 0015). No date_hierarchy: its drill-down runs a
+    DISTINCT over the date column of the whole filtered table.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    id_search_fields = ('pk',)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term.isdigit():
+            lookups = Q.create([(field, int(term)) for field in self.id_search_fields], connector=Q.OR)
+            return queryset.filter(lookups), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+class StatusListFilter(admin.SimpleListFilter):
+    """Offer the fixed task statuses instead of a SELECT DISTINCT over the column."""
+
+    def lookups(self, request, model_admin):
+        return Task.STATUS_CHOICES
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class FromStatusListFilter(StatusListFilter):
+    title = 'from status'
+    parameter_name = 'from_status'
+
+
+class ToStatusListFilter(StatusListFilter):
+    title = 'to status'
+    parameter_name = 'to_status'
+
 
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
@@ -15,34 +92,97 @@ class CustomUserAdmin(UserAdmin):
         (None, {'fields': ('color', 'avatar')}),
     )
 
+class BoardMembershipInline(admin.TabularInline):
+    model = BoardMembership
+    extra = 0
+    autocomplete_fields = ('user',)
+
+@admin.register(Board)
+class BoardAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'created_at')
+    search_fields = ('name',)
+    ordering = ('name',)
+    inlines = (BoardMembershipInline,)
+
 @admin.register(Label)
 class LabelAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'color', 'created_at')
+    list_display = ('id', 'name', 'board', 'color', 'created_at')
+    list_select_related = ('board',)
     search_fields = ('name',)
     ordering = ('name',)
+    autocomplete_fields = ('board',)
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
-    list_display = ('id', 'title', 'status', 'assignee', 'due_date', 'created_at')
+class TaskAdmin(LargeTableAdmin):
+    list_display = ('id', 'title', 'board', 'status', 'assignee', 'due_date', 'created_at')
     list_filter = ('status', 'due_date')
-    search_fields = ('title', 'description')
+    list_select_related = ('board', 'assignee')
+    search_fields = ('^title',)
     ordering = ('-created_at',)
-    filter_horizontal = ('labels',)
+    autocomplete_fields = ('board', 'assignee', 'labels')
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ('id', 'task', 'author', 'created_at', 'updated_at')
-    search_fields = ('content',)
+    list_select_related = ('task', 'author')
+    search_fields = ('^author__email',)
+    id_search_fields = ('pk', 'task_id')
     ordering = ('-created_at',)
+    autocomplete_fields = ('task', 'author')
 
 @admin.register(Attachment)
-class AttachmentAdmin(admin.ModelAdmin):
+class AttachmentAdmin(LargeTableAdmin):
     list_display = ('id', 'task', 'uploaded_by', 'original_name', 'uploaded_at')
+    list_select_related = ('task', 'uploaded_by')
+    search_fields = ('^original_name',)
+    id_search_fields = ('pk', 'task_id')
     ordering = ('-uploaded_at',)
+    autocomplete_fields = ('task', 'uploaded_by')
 
 @admin.register(ActivityLog)
-class ActivityLogAdmin(admin.ModelAdmin):
-    list_display = ('id', 'type', 'user', 'task', 'from_status', 'to_status', 'created_at')
-    list_filter = ('type', 'from_status', 'to_status')
-    search_fields = ('message',)
+class ActivityLogAdmin(LargeTableAdmin):
+    list_display = ('id', 'type', 'board', 'user', 'task', 'from_status', 'to_status', 'created_at')
+    list_filter = ('type', FromStatusListFilter, ToStatusListFilter)
+    list_select_related = ('board', 'user', 'task')
+    search_fields = ('^user__email',)
+    id_search_fields = ('pk', 'task_id')
     ordering = ('-created_at',)
+    autocomplete_fields = ('board', 'user', 'task')
+
+
+def profile_list_view(request):
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Request profiles',
+        'profiles': profiling.list_profiles(),
+    }
+    return TemplateResponse(request, 'admin/kanban/profile_list.html', context)
+
+
+def profile_detail_view(request, profile_id):
+    try:
+        meta = profiling.load_profile(profile_id)
+    except FileNotFoundError:
+        raise Http404("No such profile")
+    if request.GET.get('format') == 'collapsed':
+        response = HttpResponse(profiling.collapsed_stacks(meta), content_type='text/plain')
+        response['Content-Disposition'] = f'attachment; filename="{profile_id}.folded"'
+        return response
+    try:
+        function_stats = profiling.function_stats(profile_id, sort=request.GET.get('sort', 'cumulative'))
+    except (FileNotFoundError, KeyError):
+        function_stats = ''
+    context = {
+        **admin.site.each_context(request),
+        'title': f"{meta['method']} {meta['path']}",
+        'profile': meta,
+        'function_stats': function_stats,
+    }
+    return TemplateResponse(request, 'admin/kanban/profile_detail.html', context)
+
+
+# Mounted at admin/profiles/ by the project urls, ahead of admin.site.urls.
+profiling_urls = [
+    path('', admin.site.admin_view(profile_list_view), name='kanban_profiles'),
+    path('<str:profile_id>/', admin.site.admin_view(profile_detail_view), name='kanban_profile'),
+]
@@ -0,0 +1,314 @@
+"""
+Flow metrics (cycle time, lead time, WIP, throughput) maintained incrementally.
+
+Every status transition is written to ActivityLog and folded into
+FlowDailyRollup in the same transaction. So are the changes that move a task
+in progress between rollup keys (a new assignee or labels: a WIP move) and
+its deletion (leaving WIP if it was in progress). The analytics API then only
+reads the pre-aggregated daily rows. ``backfill_flow_rollups`` rebuilds the
+rollup from the activity history, using the keys each log row recorded.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Min, Sum
+from django.utils import timezone
+
+from .models import ActivityLog, ArchivedTask, FlowDailyRollup, Task
+
+IN_PROGRESS = 'inprogress'
+DONE = 'done'
+COUNTERS = (
+    'started', 'completed', 'wip_delta',
+    'cycle_time_seconds', 'cycle_time_count', 'lead_time_seconds', 'lead_time_count',
+)
+
+
+def transition_deltas(from_status, to_status, at, created_at=None, started_at=None):
+    """The counter changes a single status transition contributes to its day."""
+    deltas = defaultdict(int)
+    if from_status == to_status:
+        return deltas
+    if to_status == IN_PROGRESS:
+        deltas['started'] += 1
+        deltas['wip_delta'] += 1
+    if from_status == IN_PROGRESS:
+        deltas['wip_delta'] -= 1
+    if to_status == DONE:
+        deltas['completed'] += 1
+        if started_at is not None:
+            deltas['cycle_time_seconds'] += int((at - started_at).total_seconds())
+            deltas['cycle_time_count'] += 1
+        if created_at is not None:
+            deltas['lead_time_seconds'] += int((at - created_at).total_seconds())
+            deltas['lead_time_count'] += 1
+    return deltas
+
+
+def rollup_keys(assignee_id, label_ids):
+    yield 'all', 0
+    yield 'assignee', assignee_id or 0
+    for label_id in label_ids:
+        yield 'label', label_id
+
+
+def task_rollup_keys(task):
+    """The [dimension, key] rows `task` currently counts against, as stored on ActivityLog."""
+    return [[dimension, key] for dimension, key in rollup_keys(task.assignee_id, [label.pk for label in task.labels.all()])]
+
+
+def move_deltas(previous_keys, keys):
+    """WIP leaving the keys a task no longer has and entering the ones it gained."""
+    previous, current = {tuple(key) for key in previous_keys}, {tuple(key) for key in keys}
+    for dimension, key in previous - current:
+        yield dimension, key, {'wip_delta': -1}
+    for dimension, key in current - previous:
+        yield dimension, key, {'wip_delta': 1}
+
+
+def _bump(board_id, day, dimension, key, deltas):
+    changes = {name: F(name) + value for name, value in deltas.items() if value}
+    if not changes:
+        return
+    rows = FlowDailyRollup.objects.filter(board_id=board_id, day=day, dimension=dimension, key=key)
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            FlowDailyRollup.objects.create(board_id=board_id, day=day, dimension=dimension, key=key, **deltas)
+    except IntegrityError:
+        # Someone else created the row between our UPDATE and INSERT.
+        rows.update(**changes)
+
+
+def last_started_at(task_id, before):
+    return (
+        ActivityLog.objects.filter(task_id=task_id, to_status=IN_PROGRESS, created_at__lte=before)
+        .exclude(from_status=IN_PROGRESS)  # WIP moves
+        .order_by('-created_at').values_list('created_at', flat=True).first()
+    )
+
+
+def record_status_change(task, from_status, to_status, user, activity_type='task_moved', message=None):
+    """Log a status transition and fold it into the daily rollup."""
+    if from_status == to_status:
+        return None
+    with transaction.atomic():
+        keys = task_rollup_keys(task)
+        log = ActivityLog.objects.create(
+            board_id=task.board_id,
+            type=activity_type,
+            message=message or f"{task.title} moved from {from_status or 'new'} to {to_status}",
+            user=user,
+            task=task,
+            from_status=from_status,
+            to_status=to_status,
+            flow_keys=keys,
+        )
+        started_at = last_started_at(task.pk, log.created_at) if to_status == DONE else None
+        deltas = transition_deltas(from_status, to_status, log.created_at, task.created_at, started_at)
+        day = timezone.localdate(log.created_at)
+        for dimension, key in keys:
+            _bump(task.board_id, day, dimension, key, deltas)
+    return log
+
+
+def record_task_deleted(task, user):
+    """Log the deletion of `task` (before it is deleted); a task in progress leaves WIP."""
+    return record_status_change(task, task.status, None, user, 'task_deleted', f"{task.title} deleted")
+
+
+def record_wip_move(task, previous_keys, user, status=None):
+    """
+    Log and fold in a change of assignee or labels. Only a task that was in
+    progress (`status`, defaulting to its current one) moves WIP between keys.
+    """
+    keys = task_rollup_keys(task)
+    if (status or task.status) != IN_PROGRESS or sorted(keys) == sorted(previous_keys):
+        return None
+    with transaction.atomic():
+        log = ActivityLog.objects.create(
+            board_id=task.board_id,
+            type='task_updated',
+            message=f"{task.title} reassigned or relabelled while in progress",
+            user=user,
+            task=task,
+            from_status=IN_PROGRESS,
+            to_status=IN_PROGRESS,
+            flow_keys=keys,
+            previous_flow_keys=previous_keys,
+        )
+        day = timezone.localdate(log.created_at)
+        for dimension, key, deltas in move_deltas(previous_keys, keys):
+            _bump(task.board_id, day, dimension, key, deltas)
+    return log
+
+
+def counted_state(task):
+    """
+    (status, rollup keys) of `task` as the rollup last counted it: from its
+    latest logged transition or WIP move. None if it has none (a task created
+    outside the API). Rows logged before keys were recorded use its keys today.
+    """
+    log = (
+        ActivityLog.objects.filter(task_id=task.pk).exclude(to_status=None)
+        .order_by('-created_at', '-id').values_list('to_status', 'flow_keys').first()
+    )
+    if log is None:
+        return None
+    status, keys = log
+    return status, keys if keys is not None else task_rollup_keys(task)
+
+
+def _task_states(task_ids):
+    """
+    (created_at, rollup keys) of each live or archived task in `task_ids`. Once
+    a task is deleted, its creation is read from its task_created log row and
+    the keys are unknown (None).
+    """
+    states = {}
+    for model in (Task, ArchivedTask):
+        tasks = model.objects.filter(pk__in=task_ids).only('created_at', 'assignee_id').prefetch_related('labels')
+        for task in tasks:
+            states.setdefault(task.pk, (task.created_at, task_rollup_keys(task)))
+    deleted = set(task_ids) - set(states)
+    if deleted:
+        created = dict(
+            ActivityLog.objects.filter(task_id__in=deleted, type='task_created')
+            .values('task_id').annotate(first=Min('created_at')).values_list('task_id', 'first')
+        )
+        for task_id in deleted:
+            states[task_id] = (created.get(task_id), None)
+    return states
+
+
+def _starts_before(task_ids, before):
+    """The latest start of each task in `task_ids` before `before`, from the status history."""
+    return dict(
+        ActivityLog.objects.filter(task_id__in=task_ids, to_status=IN_PROGRESS, created_at__lt=before)
+        .exclude(from_status=IN_PROGRESS)  # WIP moves
+        .values('task_id').annotate(last=Max('created_at')).values_list('task_id', 'last')
+    )
+
+
+def _batches(logs, size):
+    batch = []
+    for log in logs.iterator(chunk_size=size):
+        batch.append(log)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def rebuild_rollups(since=None, chunk_size=2000):
+    """
+    Recompute FlowDailyRollup from ActivityLog, optionally only from `since` (a
+    date) on. Task states, and with `since` the starts before it, are loaded
+    in bulk once per chunk of log rows.
+    """
+    logs = ActivityLog.objects.exclude(from_status=None, to_status=None).order_by('created_at', 'id')
+    since_at = None
+    if since is not None:
+        since_at = timezone.make_aware(datetime.combine(since, time.min))
+        logs = logs.filter(created_at__gte=since_at)
+
+    rows = defaultdict(lambda: defaultdict(int))
+    started = {}
+    states = {}
+    for batch in _batches(logs, chunk_size):
+        new_ids = {log.task_id for log in batch if log.task_id is not None} - set(states)
+        if new_ids:
+            states.update(_task_states(new_ids))
+            if since_at is not None:
+                started.update(_starts_before(new_ids, since_at))
+
+        for log in batch:
+            created_at, current_keys = states.get(log.task_id, (None, None))
+            # Rows written before the keys were recorded fall back to the task's keys today.
+            keys = log.flow_keys if log.flow_keys is not None else current_keys or [['all', 0]]
+            day = timezone.localdate(log.created_at)
+            if log.previous_flow_keys is not None:
+                for dimension, key, deltas in move_deltas(log.previous_flow_keys, keys):
+                    rows[(log.board_id, dimension, key, day)]['wip_delta'] += deltas['wip_delta']
+                continue
+
+            started_at = started.get(log.task_id) if log.to_status == DONE else None
+            deltas = transition_deltas(log.from_status, log.to_status, log.created_at, created_at, started_at)
+            if log.to_status == IN_PROGRESS and log.task_id is not None:
+                started[log.task_id] = log.created_at
+
+            for dimension, key in keys:
+                for name, value in deltas.items():
+                    rows[(log.board_id, dimension, key, day)][name] += value
+
+    with transaction.atomic():
+        existing = FlowDailyRollup.objects.all()
+        if since is not None:
+            existing = existing.filter(day__gte=since)
+        existing.delete()
+        FlowDailyRollup.objects.bulk_create(
+            (
+                FlowDailyRollup(board_id=board_id, dimension=dimension, key=key, day=day, **counters)
+                for (board_id, dimension, key, day), counters in rows.items()
+                if any(counters.values())
+            ),
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def _average_hours(total_seconds, count):
+    return round(total_seconds / count / 3600, 2) if count else None
+
+
+def flow_metrics(board_id, dimension, start, end, key=None):
+    """
+    Flow metrics for every key of `dimension` on one board between `start`
+    and `end` (inclusive dates), read entirely from FlowDailyRollup.
+    """
+    rollups = FlowDailyRollup.objects.filter(board_id=board_id, dimension=dimension)
+    rows = rollups.filter(day__gte=start, day__lte=end)
+    baseline = rollups.filter(day__lt=start)
+    if key is not None:
+        rows = rows.filter(key=key)
+        baseline = baseline.filter(key=key)
+
+    wip_before = {
+        row['key']: row['wip'] or 0
+        for row in baseline.values('key').annotate(wip=Sum('wip_delta')).order_by()
+    }
+    by_key = defaultdict(list)
+    for row in rows.order_by('day').values('key', 'day', *COUNTERS):
+        by_key[row['key']].append(row)
+
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    series = []
+    for row_key in sorted(set(by_key) | set(wip_before)):
+        daily = {row['day']: row for row in by_key.get(row_key, [])}
+        totals = {name: sum(row[name] for row in daily.values()) for name in COUNTERS}
+
+        wip, running = [], wip_before.get(row_key, 0)
+        throughput = defaultdict(int)
+        for day in days:
+            row = daily.get(day)
+            if row:
+                running += row['wip_delta']
+                throughput[day - timedelta(days=day.weekday())] += row['completed']
+            wip.append({"date": day, "wip": running})
+
+        series.append({
+            "key": row_key,
+            "started": totals['started'],
+            "completed": totals['completed'],
+            "cycleTimeAvgHours": _average_hours(totals['cycle_time_seconds'], totals['cycle_time_count']),
+            "leadTimeAvgHours": _average_hours(totals['lead_time_seconds'], totals['lead_time_count']),
+            "weeklyThroughput": [
+                {"weekStart": week, "completed": throughput.get(week, 0)}
+                for week in sorted({day - timedelta(days=day.weekday()) for day in days})
+            ],
+            "wip": wip,
+        })
+    return series
@@ -0,0 +1,117 @@
+"""
+Moving long-finished tasks out of the hot kanban_task table.
+
+``archive_done_tasks`` copies tasks that have been done for more than N days,
+with their label links, comments and attachment metadata, into the Archived*
+tables and deletes the originals, one batch per transaction. Archived ids are
+the original task ids, so ``?include_archived=1`` lookups keep working.
+Per-board running totals live in StatCounter so the dashboard does not have
+to count the archive.
+"""
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .filters import LABEL_MATCH_ANY, filter_by_labels
+from .models import (
+    ArchivedAttachment, ArchivedComment, ArchivedTask, Attachment,
+    Comment, StatCounter, Task,
+)
+
+def archived_counter(board_id):
+    return f'archived_tasks:{board_id}'
+
+
+def archive_batch(cutoff, batch_size):
+    """Archive up to `batch_size` tasks done since before `cutoff`; returns how many moved."""
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update()
+            .filter(status='done', updated_at__lt=cutoff)
+            .order_by('updated_at', 'id')[:batch_size]
+        )
+        if not tasks:
+            return 0
+        ids = [task.pk for task in tasks]
+
+        ArchivedTask.objects.bulk_create([
+            ArchivedTask(
+                id=task.pk, board_id=task.board_id, title=task.title, description=task.description, status=task.status,
+                assignee_id=task.assignee_id, due_date=task.due_date,
+                created_at=task.created_at, updated_at=task.updated_at, version=task.version,
+            )
+            for task in tasks
+        ])
+        ArchivedTask.labels.through.objects.bulk_create([
+            ArchivedTask.labels.through(archivedtask_id=task_id, label_id=label_id)
+            for task_id, label_id in Task.labels.through.objects.filter(task_id__in=ids)
+            .values_list('task_id', 'label_id')
+        ])
+        ArchivedComment.objects.bulk_create(
+            (ArchivedComment(**row) for row in Comment.objects.filter(task_id__in=ids).values(
+                'id', 'task_id', 'author_id', 'content', 'created_at', 'updated_at',
+            ).iterator()),
+            batch_size=1000,
+        )
+        ArchivedAttachment.objects.bulk_create(
+            (ArchivedAttachment(**row) for row in Attachment.objects.filter(task_id__in=ids).values(
+                'id', 'task_id', 'uploaded_by_id', 'file', 'original_name', 'uploaded_at',
+            ).iterator()),
+            batch_size=1000,
+        )
+
+        # Activity rows keep their task_id, which is now the ArchivedTask's id.
+        # Comments and attachment rows cascade. Attachment files stay on disk
+        # and are now referenced by ArchivedAttachment.
+        Task.objects.filter(pk__in=ids).delete()
+        for board_id, count in Counter(task.board_id for task in tasks).items():
+            StatCounter.add(archived_counter(board_id), count)
+    return len(ids)
+
+
+def archive_done_tasks(days, batch_size=500, pause=0):
+    cutoff = timezone.now() - timedelta(days=days)
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+def archived_task_search_queryset(board_id, query='', status=None, assignee=None, label_ids=(),
+                                  label_match=LABEL_MATCH_ANY):
+    """The archive-side twin of views.task_search_queryset."""
+    tasks = ArchivedTask.objects.select_related('assignee').prefetch_related('labels').filter(board_id=board_id)
+    if query:
+        tasks = tasks.filter(Q(title__icontains=query) | Q(description__icontains=query))
+    if status:
+        tasks = tasks.filter(status=status)
+    if assignee:
+        tasks = tasks.filter(assignee__id=assignee)
+    return filter_by_labels(tasks, label_ids, label_match)
+
+
+def with_task_titles(logs):
+    """
+    Annotate ActivityLog rows with ``task_title``, read from the live task or
+    its archived copy in the same query. Deleted tasks have no title (None).
+    Subqueries rather than a join on ``task``: a filter on task_id would turn
+    that join into an INNER one and drop the rows of archived tasks.
+    """
+    titles = [
+        Subquery(model.objects.filter(pk=OuterRef('task_id')).values('title')[:1])
+        for model in (Task, ArchivedTask)
+    ]
+    return logs.annotate(task_title=Coalesce(*titles))
+
+
+def wants_archived(params):
+    return params.get('include_archived') in ('1', 'true')
@@ -0,0 +1,254 @@
+"""
+Native async versions of the hot read endpoints, mounted under /api/async/.
+
+They share their querysets and serializers with the sync views in views.py.
+Independent queries run concurrently via ``gather_queries``. Each query runs
+on its own worker thread with its own connection, because the async ORM
+funnels every query through the single thread-sensitive executor and would
+serialise them again.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import db_router, throttling, typeahead
+from .archive import archived_task_search_queryset, wants_archived
+from .authentication import CachedJWTAuthentication
+from .boards import member_filter, resolve_board
+from .filters import LABEL_MATCH_ANY, filter_by_labels, parse_id_list
+from .models import ArchivedTask, Task
+from .serializers import ActivityLogSerializer, TaskSerializer, UserSerializer, label_dictionary
+from .views import (
+    TaskListCreateView, UserSearchView, archived_task_count, dashboard_stat_queries, recent_activity_queryset, status_counts,
+    task_search_queryset, task_status_rows, user_search_queryset,
+)
+
+
+def _run_query(fn):
+    try:
+        return fn()
+    finally:
+        close_old_connections()
+
+
+async def gather_queries(*fns):
+    """Run independent, synchronous ORM callables concurrently."""
+    return await asyncio.gather(*(
+        sync_to_async(_run_query, thread_sensitive=False)(fn) for fn in fns
+    ))
+
+
+def _authenticate(request):
+    drf_request = Request(request, authenticators=[CachedJWTAuthentication()])
+    return drf_request.user, drf_request.auth
+
+
+def _error_response(exc):
+    response = JsonResponse(exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail},
+                            status=exc.status_code)
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+def async_api_view(view=None, *, cost=1, expensive=False):
+    """
+    Authenticate with the cached JWT authenticator, charge `cost` to the
+    client's rate limit (plus an in-flight slot when `expensive`, as
+    throttling.ConcurrencyLimitMixin does) and opt the view into replica reads.
+    """
+    if view is None:
+        return functools.partial(async_api_view, cost=cost, expensive=expensive)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return JsonResponse({"error": "Method not allowed"}, status=405)
+        try:
+            user, _ = await sync_to_async(_authenticate)(request)
+        except APIException as exc:
+            return _error_response(exc)
+        if not user.is_authenticated:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        request.user = user
+
+        name = f'async_views.{view.__name__}'
+        ident = BaseThrottle().get_ident(request)
+        try:
+            await sync_to_async(throttling.check_rate)(request, ident, name, cost)
+            inflight = await sync_to_async(throttling.enter_expensive)(request, ident, name) if expensive else ()
+        except APIException as exc:
+            return _error_response(exc)
+
+        pinned = await sync_to_async(db_router.is_pinned_to_primary)(request)
+        try:
+            with db_router.replica_reads(not pinned):
+                return await view(request, *args, **kwargs)
+        except APIException as exc:
+            return _error_response(exc)
+        finally:
+            if inflight:
+                await sync_to_async(throttling.leave_expensive)(inflight)
+
+    return wrapper
+
+
+@async_api_view(cost=2)
+async def task_list(request):
+    params = request.GET
+    board_id = await sync_to_async(resolve_board)(request)
+    tasks = task_search_queryset(board_id, status=params.get('status'), assignee=params.get('assignee'))
+    # ?search= goes through the same SearchFilter as /api/tasks: every term must match.
+    tasks = SearchFilter().filter_queryset(Request(request), tasks, TaskListCreateView)
+    tasks = filter_by_labels(tasks, parse_id_list(params.get('labels')), params.get('labelMatch', LABEL_MATCH_ANY))
+
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    try:
+        page_number = max(int(params.get('page', 1)), 1)
+    except ValueError:
+        return JsonResponse({"detail": "Invalid page."}, status=404)
+    offset = (page_number - 1) * page_size
+
+    serializer = TaskSerializer(context={'request': request})
+    rows = serializer.narrow_queryset(tasks)
+    count, page = await gather_queries(
+        tasks.count,
+        lambda: list(rows.order_by('id')[offset:offset + page_size]),
+    )
+    if page_number > 1 and not page:
+        return JsonResponse({"detail": "Invalid page."}, status=404)
+
+    results = {"success": True, "data": TaskSerializer(page, many=True, context={'request': request}).data}
+    if serializer.render_label_ids:
+        results["labels"] = label_dictionary(page)
+
+    url = request.build_absolute_uri()
+    has_next = offset + page_size < count
+    previous = None
+    if page_number > 1:
+        previous = remove_query_param(url, 'page') if page_number == 2 else replace_query_param(url, 'page', page_number - 1)
+    return JsonResponse({
+        "count": count,
+        "next": replace_query_param(url, 'page', page_number + 1) if has_next else None,
+        "previous": previous,
+        "results": results,
+    })
+
+
+@async_api_view
+async def task_detail(request, pk):
+    visible = member_filter(request.user)
+    task = await Task.objects.select_related('assignee').prefetch_related('labels').filter(pk=pk, **visible).afirst()
+    if task is None and wants_archived(request.GET):
+        archived = ArchivedTask.objects.select_related('assignee').prefetch_related('labels')
+        task = await archived.filter(pk=pk, **visible).afirst()
+    if task is None:
+        return JsonResponse({"detail": "No Task matches the given query."}, status=404)
+    return JsonResponse({"success": True, "data": TaskSerializer(task).data})
+
+
+@async_api_view(cost=5, expensive=True)
+async def task_search(request):
+    params = request.GET
+    query = params.get('q', '')
+    status = params.get('status')
+    assignee = params.get('assignee')
+    label_ids = parse_id_list(params.get('labels'))
+    label_match = params.get('labelMatch', LABEL_MATCH_ANY)
+    board_id = await sync_to_async(resolve_board)(request)
+    serializer = TaskSerializer(context={'request': request})
+    tasks = serializer.narrow_queryset(task_search_queryset(board_id, query, status, assignee, label_ids, label_match))
+
+    rows = [task async for task in tasks]
+    if wants_archived(params):
+        archived = serializer.narrow_queryset(
+            archived_task_search_queryset(board_id, query, status, assignee, label_ids, label_match)
+        )
+        rows += [task async for task in archived]
+    data = {
+        "tasks": TaskSerializer(rows, many=True, context={'request': request}).data,
+        "totalResults": len(rows),
+        "searchQuery": query,
+        "filters": {
+            "status": [status] if status else [],
+            "labels": label_ids,
+            "labelMatch": label_match,
+            "assignee": assignee
+        }
+    }
+    if serializer.render_label_ids:
+        data["labels"] = label_dictionary(rows)
+    return JsonResponse({"success": True, "data": data})
+
+
+@async_api_view(cost=3, expensive=True)
+async def user_search(request):
+    query = request.GET.get('q', '')
+    limit = typeahead.parse_limit(request.GET.get('limit'), UserSearchView.default_limit, UserSearchView.max_limit)
+    board_id = await sync_to_async(resolve_board)(request)
+    users = [user async for user in user_search_queryset(board_id, query).order_by('id')[:limit]]
+    return JsonResponse({
+        "success": True,
+        "data": {
+            "users": UserSerializer(users, many=True).data,
+            "totalResults": len(users),
+            "searchQuery": query
+        }
+    })
+
+
+@async_api_view(cost=8, expensive=True)
+async def global_search(request):
+    query = request.GET.get('q', '')
+    archived = wants_archived(request.GET)
+    board_id = await sync_to_async(resolve_board)(request)
+    tasks, archived_tasks, users = await gather_queries(
+        lambda: list(task_search_queryset(board_id, query)),
+        lambda: list(archived_task_search_queryset(board_id, query)) if archived else [],
+        lambda: list(user_search_queryset(board_id, query)),
+    )
+    tasks += archived_tasks
+    return JsonResponse({
+        "success": True,
+        "data": {
+            "query": query,
+            "tasks": TaskSerializer(tasks, many=True).data,
+            "users": UserSerializer(users, many=True).data,
+            "totalTaskResults": len(tasks),
+            "totalUserResults": len(users)
+        }
+    })
+
+
+@async_api_view(cost=3, expensive=True)
+async def dashboard_stats(request):
+    queries = dashboard_stat_queries(await sync_to_async(resolve_board)(request))
+    counts = iter(await gather_queries(*(count for parts in queries.values() for count in parts)))
+    data = {name: sum(next(counts) for _ in parts) for name, parts in queries.items()}
+    return JsonResponse({"success": True, "data": data})
+
+
+@async_api_view(cost=2)
+async def dashboard_activity(request):
+    board_id = await sync_to_async(resolve_board)(request)
+    logs = [log async for log in recent_activity_queryset(board_id)]
+    return JsonResponse({"success": True, "data": ActivityLogSerializer(logs, many=True).data})
+
+
+@async_api_view(cost=2)
+async def task_analytics(request):
+    board_id = await sync_to_async(resolve_board)(request)
+    rows, archived = await gather_queries(
+        lambda: list(task_status_rows(board_id)),
+        lambda: archived_task_count(board_id),
+    )
+    return JsonResponse({"success": True, "data": status_counts(rows, archived)})
@@ -0,0 +1,193 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .db_router import PRIMARY_DB
+from .models import AuthRevocation, CustomUser
+
+# Rows written by other workers are read back from slightly before the last
+# sync, so a commit that lands late or a small clock difference is not missed.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class TTLCache:
+    """A small thread-safe LRU whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+user_cache = TTLCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 30),
+)
+
+
+class RevocationList:
+    """
+    This process's copy of the AuthRevocation table. It is refreshed at most
+    every AUTH_REVOCATION_REFRESH seconds with the rows added since the last
+    refresh, so another worker's logout or user change reaches this one
+    within about that long. Revoked jtis are held until their token expires.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._jtis = {}
+        self._synced_at = None
+        self._next_sync = 0
+
+    def refresh(self, force=False):
+        if not force and time.monotonic() < self._next_sync:
+            return
+        with self._lock:
+            if not force and time.monotonic() < self._next_sync:
+                return
+            started = timezone.now()
+            # Read the primary: a lagging replica would delay revocations.
+            rows = AuthRevocation.objects.using(PRIMARY_DB).filter(expires_at__gt=started)
+            if self._synced_at is not None:
+                rows = rows.filter(created_at__gte=self._synced_at - SYNC_OVERLAP)
+            for jti, user_id, expires_at in rows.values_list('jti', 'user_id', 'expires_at'):
+                if jti:
+                    self._jtis[jti] = expires_at.timestamp()
+                if user_id is not None:
+                    user_cache.pop(str(user_id))
+            now = time.time()
+            self._jtis = {jti: expires for jti, expires in self._jtis.items() if expires > now}
+            self._synced_at = started
+            self._next_sync = time.monotonic() + self.interval
+
+    def add(self, jti, expires):
+        with self._lock:
+            self._jtis[jti] = expires
+
+    def __contains__(self, jti):
+        self.refresh()
+        return jti in self._jtis
+
+    def clear(self):
+        with self._lock:
+            self._jtis.clear()
+            self._synced_at = None
+            self._next_sync = 0
+
+
+revocations = RevocationList(getattr(settings, 'AUTH_REVOCATION_REFRESH', 1))
+
+
+def invalidate_user(user_id):
+    """Drop a user from every worker's auth cache: now in this process, within AUTH_REVOCATION_REFRESH elsewhere."""
+    user_cache.pop(str(user_id))
+    AuthRevocation.objects.create(
+        user_id=user_id, expires_at=timezone.now() + timedelta(seconds=user_cache.ttl),
+    )
+
+
+def revoke_access_token(token):
+    """Deny an access token, on every worker, until it would have expired anyway."""
+    jti = token.get(api_settings.JTI_CLAIM)
+    if jti is None or token['exp'] <= time.time():
+        return
+    AuthRevocation.objects.get_or_create(
+        jti=jti, defaults={'expires_at': datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)},
+    )
+    revocations.add(jti, token['exp'])
+
+
+def is_revoked(token):
+    jti = token.get(api_settings.JTI_CLAIM)
+    return jti is not None and jti in revocations
+
+
+@receiver(post_save, sender=CustomUser)
+def _invalidate_saved_user(instance, created, update_fields=None, **kwargs):
+    # Logins only touch last_login; nothing cached depends on it.
+    if not created and set(update_fields or ()) != {'last_login'}:
+        invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def _invalidate_deleted_user(instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that remembers users for AUTH_USER_CACHE_TTL seconds
+    instead of loading them from the database on every request, and rejects
+    access tokens revoked at logout via the shared deny list (AuthRevocation).
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        else:
+            self.check_user(user, validated_token)
+        # Hand each request its own instance so views can't mutate the cached one.
+        return copy.copy(user)
+
+    def check_user(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
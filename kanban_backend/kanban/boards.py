@@ -0,0 +1,60 @@
+"""
+Board scoping for the API.
+
+Every task, label and activity row belongs to a board and users only see the
+boards they are members of. A request names its board with ``?board=<id>``
+(or ``"board"`` in a write's body) and otherwise works on the user's first
+board. Objects addressed by id are looked up through ``member_filter`` so
+another team's ids simply 404.
+"""
+from rest_framework.exceptions import NotFound, ValidationError
+
+from .models import Board, BoardMembership
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _requested_board(request):
+    params = getattr(request, 'query_params', request.GET)
+    raw = params.get('board')
+    if not raw and request.method not in SAFE_METHODS:
+        data = getattr(request, 'data', None)
+        raw = data.get('board') if hasattr(data, 'get') else None
+    if raw in (None, ''):
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ValidationError({'board': "Expected a board id."})
+
+
+def resolve_board(request):
+    """The id of the board this request works on, checked against the user's memberships."""
+    cached = getattr(request, '_board_id', None)
+    if cached is not None:
+        return cached
+    memberships = BoardMembership.objects.filter(user=request.user)
+    requested = _requested_board(request)
+    if requested is not None:
+        memberships = memberships.filter(board_id=requested)
+    board_id = memberships.order_by('board_id').values_list('board_id', flat=True).first()
+    if board_id is None:
+        raise NotFound("Board not found." if requested is not None else "You are not a member of any board.")
+    request._board_id = board_id
+    return board_id
+
+
+def member_filter(user, path='board'):
+    """Filter kwargs limiting a queryset to rows on boards `user` belongs to."""
+    return {f'{path}__memberships__user': user}
+
+
+def is_member(user_id, board_id):
+    return BoardMembership.objects.filter(user_id=user_id, board_id=board_id).exists()
+
+
+def create_personal_board(user):
+    """Give a new user a board of their own; others join it through the members endpoint."""
+    board = Board.objects.create(name=f"{user.username[:90]}'s board")
+    BoardMembership.objects.create(board=board, user=user)
+    return board
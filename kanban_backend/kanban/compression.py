@@ -0,0 +1,126 @@
+import re
+import threading
+import zlib
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+
+class GzipStream:
+    def __init__(self):
+        self._obj = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        # Sync-flush each chunk so a streaming client sees data as it is produced.
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class BrotliStream:
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=5)
+
+    def chunk(self, data):
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class ZstdStream:
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def chunk(self, data):
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+# encoding -> (one-shot compress, streaming compressor class)
+# One-shot gzip pads the header with a random file name (see COMPRESSION_MAX_RANDOM_BYTES).
+CODECS = {'gzip': (
+    lambda data: compress_string(data, max_random_bytes=settings.COMPRESSION_MAX_RANDOM_BYTES),
+    GzipStream,
+)}
+if brotli is not None:
+    CODECS['br'] = (lambda data: brotli.compress(data, quality=5), BrotliStream)
+if zstandard is not None:
+    CODECS['zstd'] = (lambda data: zstandard.ZstdCompressor(level=3).compress(data), ZstdStream)
+
+re_accept_encoding = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def choose_encoding(accept_encoding, preferred):
+    """
+    Pick the first of `preferred` that the client accepts and we can produce.
+    A coding listed with q=0 is refused even when ``*`` is also accepted.
+    """
+    accepted, rejected = set(), set()
+    for part in accept_encoding.split(','):
+        match = re_accept_encoding.match(part)
+        if not match:
+            continue
+        name, q = match.group(1).lower(), match.group(2)
+        try:
+            refused = q is not None and float(q) == 0
+        except ValueError:
+            continue
+        (rejected if refused else accepted).add(name)
+    for name in preferred:
+        if name not in CODECS or name in rejected:
+            continue
+        if name in accepted or ('*' in accepted and '*' not in rejected):
+            return name
+    return None
+
+
+class CompressionStats:
+    """Per-endpoint raw vs. sent byte counters, kept in process memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = defaultdict(lambda: {
+            'responses': 0, 'compressedResponses': 0, 'rawBytes': 0, 'sentBytes': 0,
+        })
+
+    def record(self, endpoint, raw, sent, compressed):
+        with self._lock:
+            entry = self._data[endpoint]
+            entry['responses'] += 1
+            entry['compressedResponses'] += int(compressed)
+            entry['rawBytes'] += raw
+            entry['sentBytes'] += sent
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {endpoint: dict(entry) for endpoint, entry in self._data.items()}
+        for entry in endpoints.values():
+            entry['savedBytes'] = entry['rawBytes'] - entry['sentBytes']
+        return {
+            'encodings': sorted(CODECS),
+            'endpoints': endpoints,
+            'totalRawBytes': sum(e['rawBytes'] for e in endpoints.values()),
+            'totalSentBytes': sum(e['sentBytes'] for e in endpoints.values()),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+
+stats = CompressionStats()
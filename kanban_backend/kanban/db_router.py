@@ -0,0 +1,82 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+
+# Set for the duration of a read-only view once we know the caller has not
+# written recently; everything else (auth lookups, mutations) stays on the primary.
+replica_reads_allowed = ContextVar('replica_reads_allowed', default=False)
+
+PRIMARY_DB = 'default'
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+
+def _pin_cache():
+    # Shared by every worker: the read after a write may land on another process.
+    return caches[getattr(settings, 'SHARED_CACHE', 'default')]
+
+
+def _pin_key(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"replica-pin:user:{user.pk}"
+    return f"replica-pin:ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def pin_to_primary(request):
+    """Keep this client's reads on the primary for a few seconds after a write."""
+    if replica_aliases() and sticky_seconds() > 0:
+        _pin_cache().set(_pin_key(request), True, sticky_seconds())
+
+
+def is_pinned_to_primary(request):
+    return bool(replica_aliases()) and _pin_cache().get(_pin_key(request), False)
+
+
+@checks.register(checks.Tags.caches)
+def check_pin_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get(getattr(settings, 'SHARED_CACHE', 'default'), {}).get('BACKEND', '')
+    if replica_aliases() and backend.endswith('LocMemCache'):
+        return [checks.Warning(
+            "Read-after-write pins are kept in per-process memory.",
+            hint="With more than one worker process a read can miss its client's pin and see a stale "
+                 "replica; set KANBAN_REDIS_URL.",
+            id='kanban.W001',
+        )]
+    return []
+
+
+@contextmanager
+def replica_reads(allowed=True):
+    token = replica_reads_allowed.set(allowed)
+    try:
+        yield
+    finally:
+        replica_reads_allowed.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Send reads to a replica only when the current view has opted in."""
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if replicas and replica_reads_allowed.get():
+            return random.choice(replicas)
+        return PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
@@ -0,0 +1,45 @@
+from django.db.models import Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+
+LABEL_MATCH_ANY = 'any'
+LABEL_MATCH_ALL = 'all'
+
+
+def parse_id_list(raw, param='labels'):
+    """Turn "1,2,3" into a de-duplicated list of ints, rejecting junk with a 400."""
+    if not raw:
+        return []
+    try:
+        ids = [int(part) for part in raw.split(',') if part.strip()]
+    except ValueError:
+        raise ValidationError({param: "Expected a comma-separated list of ids."})
+    return list(dict.fromkeys(ids))
+
+
+def filter_by_labels(queryset, label_ids, match=LABEL_MATCH_ANY):
+    """
+    Filter tasks (live or archived) by label with semi-joins against the
+    task/label link table.
+
+    Unlike ``labels__id__in=...`` plus ``.distinct()`` this never multiplies the
+    task rows, so there is nothing to de-duplicate afterwards. The first label
+    set is an ``id IN (SELECT task_id ...)`` so the planner can start from the
+    label side of the link table; "all" then adds one correlated EXISTS per
+    remaining label, each answered from the (task_id, label_id) unique index.
+    """
+    if not label_ids:
+        return queryset
+    if match not in (LABEL_MATCH_ANY, LABEL_MATCH_ALL):
+        raise ValidationError({'labelMatch': f"Must be '{LABEL_MATCH_ANY}' or '{LABEL_MATCH_ALL}'."})
+
+    field = queryset.model._meta.get_field('labels')
+    Link = field.remote_field.through
+    task_column = f"{field.m2m_field_name()}_id"
+    if match == LABEL_MATCH_ANY:
+        return queryset.filter(pk__in=Link.objects.filter(label_id__in=label_ids).values(task_column))
+
+    first, *rest = label_ids
+    queryset = queryset.filter(pk__in=Link.objects.filter(label_id=first).values(task_column))
+    for label_id in rest:
+        queryset = queryset.filter(Exists(Link.objects.filter(**{task_column: OuterRef('pk')}, label_id=label_id)))
+    return queryset
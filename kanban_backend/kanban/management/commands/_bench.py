@@ -0,0 +1,28 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def rolled_back():
+    """Seed benchmark data inside a transaction that is always thrown away."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def timed(fn, repeat=5):
+    """Run fn `repeat` times and return (median_ms, min_ms, last_result)."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples), result
+
+
+def report(stdout, name, median, best, extra='', unit='ms'):
+    stdout.write(f"{name:<48} median {median:9.2f} {unit}   min {best:9.2f} {unit}   {extra}")
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from kanban.archive import archive_done_tasks
+
+
+class Command(BaseCommand):
+    help = "Move tasks that have been done for more than --days days into the archive tables, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        archived = archive_done_tasks(options['days'], options['batch_size'], options['pause'])
+        self.stdout.write(f"Archived {archived} tasks done for more than {options['days']} days")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from kanban.analytics import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily flow-metric rollup from ActivityLog status transitions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Only rebuild days on or after this date (YYYY-MM-DD).")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError("--since must be a date (YYYY-MM-DD)")
+        rows = rebuild_rollups(since, options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollup rows"))
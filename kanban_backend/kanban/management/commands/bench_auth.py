@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from kanban.authentication import CachedJWTAuthentication, user_cache
+
+from ._bench import report, rolled_back, timed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Measure per-request authentication overhead of the stock and cached JWT authenticators."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            user = User.objects.create_user(username='bench-auth', email='bench-auth@example.invalid', password=None)
+            header = f"Bearer {AccessToken.for_user(user)}"
+            request = Request(RequestFactory().get('/api/auth/me', HTTP_AUTHORIZATION=header))
+            n = options['requests']
+
+            for name, authenticator in (('JWTAuthentication', JWTAuthentication()),
+                                        ('CachedJWTAuthentication', CachedJWTAuthentication())):
+                user_cache.clear()
+
+                def run():
+                    for _ in range(n):
+                        authenticator.authenticate(request)
+
+                reset_queries()
+                with CaptureQueriesContext(connection) as queries:
+                    authenticator.authenticate(request)
+                    authenticator.authenticate(request)
+                median, best, _ = timed(run, options['repeat'])
+                report(
+                    self.stdout, name, median / n * 1000, best / n * 1000,
+                    f"{len(queries)} queries for 2 requests", unit='us',
+                )
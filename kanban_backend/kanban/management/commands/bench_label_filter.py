@@ -0,0 +1,79 @@
+import random
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from kanban.filters import LABEL_MATCH_ALL, LABEL_MATCH_ANY, filter_by_labels
+from kanban.models import Board, Label, Task
+
+from ._bench import report, rolled_back, timed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Compare JOIN+DISTINCT label filtering with the EXISTS implementation on synthetic data (rolled back afterwards)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100_000)
+        parser.add_argument('--labels-per-task', type=int, default=10)
+        parser.add_argument('--label-pool', type=int, default=50)
+        parser.add_argument('--filter-labels', type=int, default=3, help="How many labels the benchmark filters by.")
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            label_ids = self.seed(options)
+            wanted = label_ids[:options['filter_labels']]
+            page = options['page_size']
+            base = Task.objects.select_related('assignee').prefetch_related('labels')
+
+            cases = {
+                'any: join + distinct (old)': lambda: base.filter(labels__id__in=wanted).distinct(),
+                'any: semi-join (new)': lambda: filter_by_labels(base, wanted, LABEL_MATCH_ANY),
+                'all: join + distinct + having (old style)': lambda: (
+                    base.filter(labels__id__in=wanted).annotate(matched=Count('labels', distinct=True))
+                    .filter(matched=len(wanted))
+                ),
+                'all: semi-join + exists (new)': lambda: filter_by_labels(base, wanted, LABEL_MATCH_ALL),
+            }
+            for name, build in cases.items():
+                median, best, total = timed(lambda: build().count(), options['repeat'])
+                report(self.stdout, f"{name} count", median, best, f"{total} rows")
+                median, best, _ = timed(lambda: list(build().order_by('-id')[:page]), options['repeat'])
+                report(self.stdout, f"{name} first page", median, best)
+
+    def seed(self, options):
+        self.stdout.write(
+            f"Seeding {options['tasks']} tasks x {options['labels_per_task']} labels "
+            f"from a pool of {options['label_pool']}..."
+        )
+        rng = random.Random(42)
+        user = User.objects.create_user(username='bench', email='bench@example.invalid', password=None)
+        board = Board.objects.create(name='bench')
+        labels = Label.objects.bulk_create(
+            Label(board=board, name=f"bench-{i}", color='#000000') for i in range(options['label_pool'])
+        )
+        label_ids = [label.id for label in labels]
+        tasks = Task.objects.bulk_create(
+            (
+                Task(board=board, title=f"Task {i}", description='',
+                     status=rng.choice(['todo', 'inprogress', 'done']), assignee=user, due_date=date.today())
+                for i in range(options['tasks'])
+            ),
+            batch_size=5000,
+        )
+        Link = Task.labels.through
+        per_task = min(options['labels_per_task'], len(label_ids))
+        Link.objects.bulk_create(
+            (
+                Link(task_id=task.id, label_id=label_id)
+                for task in tasks
+                for label_id in rng.sample(label_ids, per_task)
+            ),
+            batch_size=10000,
+        )
+        return label_ids
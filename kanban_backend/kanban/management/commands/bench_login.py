@@ -0,0 +1,50 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from kanban.views import LoginView
+
+from ._bench import report, rolled_back, timed
+
+User = get_user_model()
+
+PROFILES = {
+    'default': [
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    ],
+    'fast': [
+        'kanban.hashers.TunedPBKDF2PasswordHasher',
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = "Measure LoginView throughput under each password-hasher profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Active profile: {settings.PASSWORD_HASHER_PROFILE}, "
+                          f"fast profile iterations: {settings.PASSWORD_HASHER_ITERATIONS}")
+        view = LoginView.as_view()
+        factory = RequestFactory()
+        n = options['logins']
+
+        for profile, hashers in PROFILES.items():
+            with override_settings(PASSWORD_HASHERS=hashers), rolled_back():
+                User.objects.create_user(username='bench-login', email='bench-login@example.invalid', password='bench-password')
+                body = json.dumps({'email': 'bench-login@example.invalid', 'password': 'bench-password'})
+
+                def run():
+                    for _ in range(n):
+                        response = view(factory.post('/api/auth/login', body, content_type='application/json'))
+                        assert response.status_code == 200, response.data
+
+                median, best, _ = timed(run, options['repeat'])
+                report(self.stdout, f"login ({profile})", median / n, best / n,
+                       f"~{1000 * n / median:.0f} logins/s per core")
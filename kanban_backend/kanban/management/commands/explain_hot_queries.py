@@ -0,0 +1,83 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.utils.timezone import now
+
+from kanban.filters import LABEL_MATCH_ALL, LABEL_MATCH_ANY, filter_by_labels
+from kanban.models import ActivityLog, Attachment, BoardMembership, Comment, Label, Task
+from kanban.views import start_of_week
+
+# SQLite: "SCAN kanban_task" without "USING ... INDEX"; Postgres: "Seq Scan on kanban_task".
+FULL_SCAN_PATTERNS = [
+    re.compile(r'\bSCAN (?P<table>kanban_\w+)(?! USING (?:COVERING )?INDEX)(?:\s|$)'),
+    re.compile(r'Seq Scan on (?P<table>kanban_\w+)'),
+]
+
+
+def hot_queries(board_id=1):
+    """Every list/filter path the API serves, keyed by a short name. All of them are scoped to one board."""
+    today = now().date()
+    week_start = start_of_week(today)
+    tasks = Task.objects.filter(board_id=board_id)
+    return {
+        'tasks_on_board': tasks.order_by('-created_at'),
+        'tasks_by_status': tasks.filter(status='todo'),
+        'tasks_by_assignee': tasks.filter(assignee_id=1),
+        'tasks_by_assignee_and_status': tasks.filter(assignee_id=1, status='todo'),
+        'tasks_by_any_label': filter_by_labels(tasks, [1, 2], LABEL_MATCH_ANY),
+        'tasks_by_all_labels': filter_by_labels(tasks.filter(status='todo'), [1, 2], LABEL_MATCH_ALL),
+        'overdue_tasks': tasks.filter(due_date__lt=today).exclude(status='done'),
+        'tasks_created_this_week': tasks.filter(created_at__gte=week_start),
+        'tasks_completed_this_week': tasks.filter(status='done', updated_at__gte=week_start),
+        'tasks_updated_recently': tasks.filter(updated_at__gte=now() - timedelta(days=1)),
+        'status_counts': tasks.values('status').annotate(count=Count('id')).order_by(),
+        'board_labels': Label.objects.filter(board_id=board_id).order_by('name'),
+        'board_membership_check': BoardMembership.objects.filter(user_id=1, board_id=board_id),
+        'task_comments_latest_page': Comment.objects.filter(task_id=1).order_by('-created_at', '-id')[:51],
+        'task_comments_after_cursor': Comment.objects.filter(task_id=1).filter(
+            Q(created_at__gt=week_start) | Q(created_at=week_start, id__gt=1)
+        ).order_by('created_at', 'id')[:51],
+        'task_comment_count': Comment.objects.filter(task_id=1).values('id'),
+        'task_attachments': Attachment.objects.filter(task_id=1).order_by('uploaded_at'),
+        'recent_activity': ActivityLog.objects.filter(board_id=board_id).order_by('-created_at')[:20],
+    }
+
+
+def full_scans(plan):
+    tables = set()
+    for pattern in FULL_SCAN_PATTERNS:
+        tables.update(match.group('table') for match in pattern.finditer(plan))
+    return sorted(tables)
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the hot list/filter queries and fail if any of them does a full table scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help="Print every plan, not just regressions.")
+
+    def handle(self, *args, **options):
+        regressions = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small tables make Postgres prefer a seq scan; we want to know whether an index *can* be used.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in hot_queries().items():
+                plan = queryset.explain()
+                scanned = full_scans(plan)
+                if scanned:
+                    regressions.append(name)
+                    self.stdout.write(self.style.ERROR(f"{name}: full scan of {', '.join(scanned)}"))
+                    self.stdout.write(plan)
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"{name}: ok"))
+                    if options['verbose_plans']:
+                        self.stdout.write(plan)
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} hot queries regressed to a full table scan: {', '.join(regressions)}")
@@ -0,0 +1,85 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+async def fetch(host, port, path, headers, timeout):
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        lines = [f"GET {path} HTTP/1.1", f"Host: {host}:{port}", "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent GETs at a running server and report throughput and latency. "
+        "Run it once against the WSGI deployment (e.g. /api/search/global) and once against "
+        "the ASGI one (/api/async/search/global) at increasing --concurrency to compare capacity."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64])
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per concurrency level.")
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--header', action='append', default=[], help="Extra header, e.g. 'Authorization: Bearer ...'.")
+        parser.add_argument('--token', help="Shortcut for an 'Authorization: Bearer <token>' header.")
+
+    def handle(self, *args, **options):
+        parts = urlsplit(options['url'])
+        if parts.scheme != 'http':
+            raise CommandError("Only plain http:// URLs are supported.")
+        path = parts.path + (f"?{parts.query}" if parts.query else '')
+        headers = [tuple(h.split(':', 1)) for h in options['header']]
+        headers = [(name.strip(), value.strip()) for name, value in headers]
+        if options['token']:
+            headers.append(('Authorization', f"Bearer {options['token']}"))
+
+        for concurrency in options['concurrency']:
+            latencies, statuses, elapsed = asyncio.run(self.run_level(
+                parts.hostname, parts.port or 80, path, headers, concurrency, options['duration'], options['timeout'],
+            ))
+            self.report(concurrency, latencies, statuses, elapsed)
+
+    async def run_level(self, host, port, path, headers, concurrency, duration, timeout):
+        latencies = []
+        statuses = Counter()
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    status = await fetch(host, port, path, headers, timeout)
+                except (OSError, asyncio.TimeoutError, ValueError, IndexError) as exc:
+                    statuses[type(exc).__name__] += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, statuses, time.perf_counter() - started
+
+    def report(self, concurrency, latencies, statuses, elapsed):
+        if not latencies:
+            self.stdout.write(f"c={concurrency:<4} no successful responses: {dict(statuses)}")
+            return
+        latencies.sort()
+        pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+        self.stdout.write(
+            f"c={concurrency:<4} {len(latencies) / elapsed:8.1f} req/s   "
+            f"p50 {statistics.median(latencies):7.1f} ms   p95 {pct(0.95):7.1f} ms   p99 {pct(0.99):7.1f} ms   "
+            f"statuses {dict(statuses)}"
+        )
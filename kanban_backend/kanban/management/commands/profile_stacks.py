@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a stored request profile as collapsed stacks (pipe into flamegraph.pl), "
+        "or list the stored profiles with --list."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile_id', nargs='?', help="Defaults to the newest profile.")
+        parser.add_argument('--list', action='store_true', help="List stored profiles instead.")
+        parser.add_argument('--stats', type=int, metavar='N', help="Print the top N cProfile functions instead.")
+
+    def handle(self, *args, **options):
+        profiles = profiling.list_profiles()
+        if options['list']:
+            for meta in profiles:
+                self.stdout.write(
+                    f"{meta['id']}  {meta['method']} {meta['path']}  {meta['status']}  "
+                    f"{meta['durationMs']}ms  sql={meta['sqlCount']}/{meta['sqlMs']}ms  {meta['trigger']}"
+                )
+            return
+
+        profile_id = options['profile_id'] or (profiles[0]['id'] if profiles else None)
+        if profile_id is None:
+            raise CommandError(f"No profiles in {profiling.profile_dir()}")
+        try:
+            if options['stats']:
+                self.stdout.write(profiling.function_stats(profile_id, limit=options['stats']), ending='')
+            else:
+                self.stdout.write(profiling.collapsed_stacks(profiling.load_profile(profile_id)), ending='')
+        except FileNotFoundError:
+            raise CommandError(f"No profile {profile_id}")
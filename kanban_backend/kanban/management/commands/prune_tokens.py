@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from kanban.models import AuthRevocation
+
+
+def prune_expired(model, batch_size=1000, pause=0.0):
+    """
+    Delete expired rows of `model` (and whatever cascades from them) in small
+    transactions so the tables never stay locked for long.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            # order_by() drops simplejwt's default ordering on user, which would
+            # otherwise force a sort of every expired row.
+            ids = list(
+                model.objects.filter(expires_at__lte=aware_utcnow())
+                .order_by().values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            model.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+        if pause:
+            time.sleep(pause)
+
+
+def prune_expired_tokens(batch_size=1000, pause=0.0):
+    """Expired outstanding tokens, with their blacklist rows by cascade."""
+    return prune_expired(OutstandingToken, batch_size, pause)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired JWT outstanding/blacklisted tokens and access-token revocations in batches. "
+        "Use --every to keep running on a schedule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+        parser.add_argument('--every', type=int, default=0, help="Repeat every N seconds instead of exiting.")
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = prune_expired_tokens(options['batch_size'], options['pause'])
+            revocations = prune_expired(AuthRevocation, options['batch_size'], options['pause'])
+            self.stdout.write(f"Pruned {deleted} expired tokens and {revocations} expired revocations")
+            if not options['every']:
+                return
+            time.sleep(options['every'])
@@ -0,0 +1,90 @@
+import logging
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+from kanban import warmup
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # optional: only needed to serve
+    BaseApplication = None
+
+
+def cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_sizing(cpus):
+    """gunicorn's 2 x cores + 1 workers; two threads each to cover database waits."""
+    return 2 * cpus + 1, 2
+
+
+def post_fork(server, worker):
+    warmup.logger.handlers = server.log.error_log.handlers
+    warmup.logger.setLevel(logging.INFO)
+    warmup.after_fork()
+
+
+if BaseApplication is not None:
+    class KanbanServer(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the API with gunicorn. The app is loaded and warmed up once in the master "
+        "and forked into the workers. kill -HUP <master pid> replaces the workers gracefully "
+        "(same code); for a code deploy send USR2 to start a new master, then WINCH and QUIT to the old one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bind', default=settings.SERVER_BIND)
+        parser.add_argument('--workers', type=int, default=settings.SERVER_WORKERS,
+                            help="Defaults to 2 x CPUs + 1.")
+        parser.add_argument('--threads', type=int, default=settings.SERVER_THREADS,
+                            help="Threads per worker, defaults to 2.")
+        parser.add_argument('--pidfile', help="Write the master's pid here, for sending signals.")
+        parser.add_argument('--warmup-only', action='store_true',
+                            help="Warm up, print the timings and exit without serving.")
+
+    def handle(self, *args, **options):
+        application = get_wsgi_application()
+        timings = warmup.warm_up(application)
+        self.stdout.write("Warm-up: " + ", ".join(f"{step} {ms}ms" for step, ms in timings.items()))
+        if options['warmup_only']:
+            return
+        if BaseApplication is None:
+            raise CommandError("gunicorn is not installed (pip install gunicorn).")
+
+        workers, threads = default_sizing(cpu_count())
+        workers = options['workers'] or workers
+        threads = options['threads'] or threads
+        self.stdout.write(f"Serving on {options['bind']} with {workers} workers x {threads} threads")
+        KanbanServer(application, {
+            'bind': options['bind'],
+            'workers': workers,
+            'threads': threads,
+            'worker_class': 'gthread' if threads > 1 else 'sync',
+            'preload_app': True,
+            'timeout': settings.SERVER_TIMEOUT,
+            'graceful_timeout': settings.SERVER_GRACEFUL_TIMEOUT,
+            'pidfile': options['pidfile'],
+            'post_fork': post_fork,
+            'proc_name': 'kanban',
+        }).run()
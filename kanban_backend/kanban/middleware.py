@@ -0,0 +1,153 @@
+import time
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from . import compression, db_router, profiling, warmup
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaStickinessMiddleware(MiddlewareMixin):
+    """Pin a client to the primary for REPLICA_STICKY_SECONDS after a successful write."""
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            db_router.pin_to_primary(request)
+        return response
+
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+def _endpoint(request):
+    match = getattr(request, 'resolver_match', None)
+    return f"/{match.route}" if match is not None else 'unresolved'
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress API responses with the best encoding the client accepts
+    (COMPRESSION_ENCODINGS, e.g. br/zstd when installed, else gzip).
+
+    Responses under COMPRESSION_MIN_SIZE, non-text payloads, file downloads
+    (attachments are usually compressed already) and anything under
+    COMPRESSION_EXCLUDE_PATHS (token responses, see BREACH) are passed through. Streaming
+    responses are compressed chunk by chunk. Raw and sent byte counts are kept
+    per endpoint in kanban.compression.stats.
+    """
+
+    def process_response(self, request, response):
+        endpoint = _endpoint(request)
+        if isinstance(response, FileResponse) or response.has_header('Content-Encoding'):
+            return response
+        if request.path.startswith(tuple(settings.COMPRESSION_EXCLUDE_PATHS)):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            compression.stats.record(endpoint, len(response.content), len(response.content), False)
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), settings.COMPRESSION_ENCODINGS,
+        )
+        if encoding is None:
+            if not response.streaming:
+                compression.stats.record(endpoint, len(response.content), len(response.content), False)
+            return response
+
+        compress, stream_class = compression.CODECS[encoding]
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async_stream(
+                    response.streaming_content, stream_class(), endpoint,
+                )
+            else:
+                response.streaming_content = self._compress_stream(
+                    response.streaming_content, stream_class(), endpoint,
+                )
+            del response.headers['Content-Length']
+        else:
+            raw = response.content
+            compressed = compress(raw)
+            if len(compressed) >= len(raw):
+                compression.stats.record(endpoint, len(raw), len(raw), False)
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+            compression.stats.record(endpoint, len(raw), len(compressed), True)
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _compress_stream(content, stream, endpoint):
+        raw = sent = 0
+        for chunk in content:
+            raw += len(chunk)
+            out = stream.chunk(chunk)
+            sent += len(out)
+            if out:
+                yield out
+        tail = stream.finish()
+        yield tail
+        compression.stats.record(endpoint, raw, sent + len(tail), True)
+
+    @staticmethod
+    async def _compress_async_stream(content, stream, endpoint):
+        raw = sent = 0
+        async for chunk in content:
+            raw += len(chunk)
+            out = stream.chunk(chunk)
+            sent += len(out)
+            if out:
+                yield out
+        tail = stream.finish()
+        yield tail
+        compression.stats.record(endpoint, raw, sent + len(tail), True)
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """
+    Profile requests on demand (staff ``X-Profile: 1``) or at PROFILE_SAMPLE_RATE;
+    see kanban.profiling. Sits after AuthenticationMiddleware so admin sessions count as staff.
+    """
+
+    def process_request(self, request):
+        trigger = profiling.trigger_for(request)
+        if trigger is not None:
+            profile = profiling.RequestProfile(trigger)
+            # Skipped while another request in this process is being profiled.
+            if profile.start():
+                request.profile = profile
+
+    def process_response(self, request, response):
+        profile = getattr(request, 'profile', None)
+        if profile is not None:
+            response['X-Profile-Id'] = profile.finish(request, response)
+        return response
+
+
+class ColdStartMiddleware(MiddlewareMixin):
+    """
+    Time every request into kanban.warmup.stats, which keeps the first few
+    per process apart. First in MIDDLEWARE so the whole stack is measured.
+    """
+
+    def process_request(self, request):
+        request._started = time.perf_counter()
+
+    def process_response(self, request, response):
+        started = getattr(request, '_started', None)
+        if started is not None:
+            warmup.stats.record(_endpoint(request), (time.perf_counter() - started) * 1000)
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-19 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0002_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['task', 'created_at', 'id'], name='comment_task_keyset_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_task_created_idx',
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index the blacklist app's expires_at column so prune_tokens can find
+    expired rows without scanning the whole outstanding token table. The
+    lookup path used on refresh (jti, token_id) is already covered by the
+    unique constraints simplejwt ships with.
+    """
+
+    dependencies = [
+        ('kanban', '0003_comment_keyset_index'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS kanban_outstanding_expires_idx '
+                'ON token_blacklist_outstandingtoken (expires_at)',
+            reverse_sql='DROP INDEX IF EXISTS kanban_outstanding_expires_idx',
+        ),
+    ]
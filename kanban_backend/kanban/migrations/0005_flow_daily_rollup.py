@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-19 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0004_outstanding_token_expiry_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlowDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(choices=[('all', 'All'), ('assignee', 'Assignee'), ('label', 'Label')], max_length=10)),
+                ('key', models.PositiveBigIntegerField(default=0)),
+                ('started', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('wip_delta', models.IntegerField(default=0)),
+                ('cycle_time_seconds', models.BigIntegerField(default=0)),
+                ('cycle_time_count', models.PositiveIntegerField(default=0)),
+                ('lead_time_seconds', models.BigIntegerField(default=0)),
+                ('lead_time_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['task', 'to_status', 'created_at'], name='activity_task_transition_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flowdailyrollup',
+            index=models.Index(fields=['dimension', 'day'], name='flow_rollup_dim_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='flowdailyrollup',
+            constraint=models.UniqueConstraint(fields=('dimension', 'key', 'day'), name='flow_rollup_unique_day'),
+        ),
+    ]
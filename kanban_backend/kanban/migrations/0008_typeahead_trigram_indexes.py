@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Expression indexes matching what icontains/istartswith compile to on
+# PostgreSQL: UPPER("column"::text) LIKE UPPER(%s).
+TRIGRAM_INDEXES = [
+    ('kanban_user_username_trgm_idx', 'kanban_customuser', 'username'),
+    ('kanban_user_email_trgm_idx', 'kanban_customuser', 'email'),
+    ('kanban_label_name_trgm_idx', 'kanban_label', 'name'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return  # other databases use the in-memory prefix index in kanban.typeahead
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    """pg_trgm GIN indexes behind the user and label typeahead (PostgreSQL only)."""
+
+    dependencies = [
+        ('kanban', '0007_task_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
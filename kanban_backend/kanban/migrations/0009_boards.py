@@ -0,0 +1,66 @@
+# Generated by Django 5.2.3 on 2026-10-19 19:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0008_typeahead_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Board',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='board',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='kanban.board'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='board',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='kanban.board'),
+        ),
+        migrations.AddField(
+            model_name='flowdailyrollup',
+            name='board',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kanban.board'),
+        ),
+        migrations.AddField(
+            model_name='label',
+            name='board',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='labels', to='kanban.board'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='board',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='kanban.board'),
+        ),
+        migrations.CreateModel(
+            name='BoardMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='kanban.board')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='board_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='members',
+            field=models.ManyToManyField(related_name='boards', through='kanban.BoardMembership', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='boardmembership',
+            constraint=models.UniqueConstraint(fields=('user', 'board'), name='board_membership_unique'),
+        ),
+    ]
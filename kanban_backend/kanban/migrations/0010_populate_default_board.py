@@ -0,0 +1,44 @@
+from django.db import migrations
+
+SCOPED_MODELS = ['Task', 'Label', 'ActivityLog', 'ArchivedTask', 'FlowDailyRollup']
+
+
+def populate_default_board(apps, schema_editor):
+    """Put everything that exists so far on one board that every current user belongs to."""
+    User = apps.get_model('kanban', 'CustomUser')
+    Board = apps.get_model('kanban', 'Board')
+    BoardMembership = apps.get_model('kanban', 'BoardMembership')
+    StatCounter = apps.get_model('kanban', 'StatCounter')
+
+    has_data = User.objects.exists() or any(
+        apps.get_model('kanban', name).objects.exists() for name in SCOPED_MODELS
+    )
+    if not has_data:
+        return
+    board = Board.objects.order_by('pk').first() or Board.objects.create(name='Default board')
+    BoardMembership.objects.bulk_create(
+        [BoardMembership(board=board, user_id=user_id) for user_id in User.objects.values_list('pk', flat=True)],
+        ignore_conflicts=True,
+    )
+    for name in SCOPED_MODELS:
+        apps.get_model('kanban', name).objects.filter(board=None).update(board=board)
+    StatCounter.objects.filter(name='archived_tasks').update(name=f'archived_tasks:{board.pk}')
+
+
+def clear_boards(apps, schema_editor):
+    Board = apps.get_model('kanban', 'Board')
+    StatCounter = apps.get_model('kanban', 'StatCounter')
+    board = Board.objects.order_by('pk').first()
+    if board is not None:
+        StatCounter.objects.filter(name=f'archived_tasks:{board.pk}').update(name='archived_tasks')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0009_boards'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_default_board, clear_boards),
+    ]
@@ -0,0 +1,131 @@
+# Generated by Django 5.2.3 on 2026-10-19 19:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0010_populate_default_board'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='flowdailyrollup',
+            name='flow_rollup_unique_day',
+        ),
+        migrations.RemoveIndex(
+            model_name='activitylog',
+            name='activity_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='archivedtask',
+            name='archived_task_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='archivedtask',
+            name='archived_task_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='flowdailyrollup',
+            name='flow_rollup_dim_day_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_status_due_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_status_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_assignee_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_due_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_updated_idx',
+        ),
+        migrations.AlterField(
+            model_name='activitylog',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='kanban.board'),
+        ),
+        migrations.AlterField(
+            model_name='archivedtask',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='kanban.board'),
+        ),
+        migrations.AlterField(
+            model_name='flowdailyrollup',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kanban.board'),
+        ),
+        migrations.AlterField(
+            model_name='label',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='labels', to='kanban.board'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='kanban.board'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['board', '-created_at'], name='activity_board_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['board', 'created_at'], name='archived_board_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['board', 'updated_at'], name='archived_board_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flowdailyrollup',
+            index=models.Index(fields=['board', 'dimension', 'day'], name='flow_rollup_board_dim_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='label',
+            index=models.Index(fields=['board', 'name'], name='label_board_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'status', 'due_date'], name='task_board_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'status', 'updated_at'], name='task_board_status_upd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'assignee', 'status'], name='task_board_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'due_date'], name='task_board_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'created_at'], name='task_board_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'updated_at'], name='task_board_updated_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='flowdailyrollup',
+            constraint=models.UniqueConstraint(fields=('board', 'dimension', 'key', 'day'), name='flow_rollup_board_unique_day'),
+        ),
+    ]
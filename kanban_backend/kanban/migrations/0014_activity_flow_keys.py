@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 19:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0013_activity_keeps_task_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitylog',
+            name='flow_keys',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='previous_flow_keys',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
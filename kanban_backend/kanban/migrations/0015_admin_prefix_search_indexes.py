@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Indexes behind the admin's prefix (``^``) searches, which compile to
+# istartswith: UPPER("column") LIKE UPPER('term%') on PostgreSQL and
+# "column" LIKE 'term%' ESCAPE '\' (case-insensitive) on SQLite. Email
+# searches are covered by the trigram index from 0008 on PostgreSQL only;
+# 0016 adds the SQLite index.
+PREFIX_INDEXES = [
+    ('kanban_task_title_prefix_idx', 'kanban_task', 'title'),
+    ('kanban_attachment_name_prefix_idx', 'kanban_attachment', 'original_name'),
+]
+
+
+def create_prefix_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for name, table, column in PREFIX_INDEXES:
+        if vendor == 'postgresql':
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name} ON {table} ((UPPER({column}::text)) text_pattern_ops)'
+            )
+        elif vendor == 'sqlite':
+            schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({column} COLLATE NOCASE)')
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor not in ('postgresql', 'sqlite'):
+        return
+    for name, _, _ in PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    """Expression indexes for the admin's prefix searches (PostgreSQL and SQLite)."""
+
+    dependencies = [
+        ('kanban', '0014_activity_flow_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+# The admin's ^user__email / ^author__email searches compile to
+# "email" LIKE 'term%' ESCAPE '\' on SQLite, which can only use an index with
+# NOCASE collation. PostgreSQL already has the trigram index from 0008.
+INDEX_NAME = 'kanban_user_email_prefix_idx'
+
+
+def create_email_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON kanban_customuser (email COLLATE NOCASE)')
+
+
+def drop_email_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+    """NOCASE email index behind the admin's email prefix searches (SQLite only)."""
+
+    dependencies = [
+        ('kanban', '0015_admin_prefix_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_index, drop_email_index),
+    ]
@@ -1,7 +1,9 @@
+import mimetypes
 import os
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
@@ -11,11 +13,38 @@ class CustomUser(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+class Board(models.Model):
+    """A team's workspace. Tasks, labels and activity belong to exactly one board."""
+    name = models.CharField(max_length=100)
+    members = models.ManyToManyField(settings.AUTH_USER_MODEL, through='BoardMembership', related_name='boards')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+class BoardMembership(models.Model):
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='board_memberships')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also the index behind every "is this user a member of board X" check.
+            models.UniqueConstraint(fields=['user', 'board'], name='board_membership_unique'),
+        ]
+
 class Label(models.Model):
+    # Indexed by the composite index below, like every board FK here.
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='labels', db_index=False)
     name = models.CharField(max_length=100)
     color = models.CharField(max_length=7)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', 'name'], name='label_board_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
     
@@ -26,6 +55,7 @@ class Task(models.Model):
         ('done', 'Done'),
     ]
 
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='tasks', db_index=False)
     title = models.CharField(max_length=255)
     description = models.TextField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='todo')
@@ -34,6 +64,40 @@ class Task(models.Model):
     labels = models.ManyToManyField(Label, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped on every write; clients send it back in If-Match to detect lost updates.
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            # Every list, search and dashboard query is scoped to one board.
+            models.Index(fields=['board', 'status', 'due_date'], name='task_board_status_due_idx'),
+            models.Index(fields=['board', 'status', 'updated_at'], name='task_board_status_upd_idx'),
+            models.Index(fields=['board', 'assignee', 'status'], name='task_board_assignee_idx'),
+            models.Index(fields=['board', 'due_date'], name='task_board_due_idx'),
+            models.Index(fields=['board', 'created_at'], name='task_board_created_idx'),
+            models.Index(fields=['board', 'updated_at'], name='task_board_updated_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+
+    def update_if_version(self, expected_version, **fields):
+        """
+        Write `fields` with a single ``UPDATE ... WHERE id = ? AND version = ?``,
+        bumping the version. Returns False, leaving this instance untouched, if
+        the row has moved on from `expected_version`.
+        """
+        fields['updated_at'] = timezone.now()
+        if not versioned_update(Task.objects.filter(pk=self.pk), expected_version, **fields):
+            return False
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.version = expected_version + 1
+        return True
 
     def attachment_count(self):
         return 0  # placeholder
@@ -44,6 +108,18 @@ class Task(models.Model):
     def __str__(self):
         return self.title
     
+def versioned_update(tasks, expected_version=None, **fields):
+    """
+    Write `fields` to `tasks` in one UPDATE, bumping each row's version. With
+    `expected_version`, only rows still at that version are written. Returns
+    the number of rows updated.
+    """
+    if expected_version is not None:
+        tasks = tasks.filter(version=expected_version)
+    fields.setdefault('updated_at', timezone.now())
+    return tasks.update(version=models.F('version') + 1, **fields)
+
+
 class Comment(models.Model):
     task = models.ForeignKey('Task', on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -51,6 +127,11 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at', 'id'], name='comment_task_keyset_idx'),
+        ]
+
 def attachment_upload_path(instance, filename):
     return f"attachments/task_{instance.task.id}/{filename}"
 
@@ -61,11 +142,17 @@ class Attachment(models.Model):
     original_name = models.CharField(max_length=255)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'uploaded_at'], name='attachment_task_uploaded_idx'),
+        ]
+
     def name(self):
         return os.path.basename(self.file.name)
 
     def type(self):
-        return self.file.file.content_type if hasattr(self.file, 'file') else ""
+        # Stored files carry no upload content type; go by the name, without opening the file.
+        return mimetypes.guess_type(self.original_name or self.file.name)[0] or ""
 
     def size(self):
         return self.file.size if self.file else 0
@@ -81,10 +168,149 @@ class ActivityLog(models.Model):
         ('task_deleted', 'Task Deleted'),
     ]
 
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='activity', db_index=False)
     type = models.CharField(max_length=50, choices=ACTIVITY_TYPES)
     message = models.TextField()
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    task = models.ForeignKey('Task', on_delete=models.CASCADE, null=True, blank=True)
+    # No constraint or cascade: the history outlives the task, whether it is
+    # deleted or moved to ArchivedTask (which keeps the same id).
+    task = models.ForeignKey('Task', on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True)
     from_status = models.CharField(max_length=20, null=True, blank=True)
     to_status = models.CharField(max_length=20, null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    # The [dimension, key] rollup rows a transition was counted against, and
+    # for a WIP move (assignee or labels changed while in progress) the rows
+    # it left, so rebuilding the rollup does not depend on the task's state today.
+    flow_keys = models.JSONField(null=True, blank=True)
+    previous_flow_keys = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', '-created_at'], name='activity_board_created_idx'),
+            models.Index(fields=['task', 'to_status', 'created_at'], name='activity_task_transition_idx'),
+        ]
+
+class FlowDailyRollup(models.Model):
+    """
+    Per-day flow counters derived from ActivityLog status transitions.
+
+    One row per (board, dimension, key, day): dimension "all" uses key 0,
+    "assignee" keys by user id (0 = unassigned) and "label" by label id. WIP on a day is
+    the running sum of wip_delta up to and including that day.
+    """
+    DIMENSIONS = [
+        ('all', 'All'),
+        ('assignee', 'Assignee'),
+        ('label', 'Label'),
+    ]
+
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='+', db_index=False)
+    day = models.DateField()
+    dimension = models.CharField(max_length=10, choices=DIMENSIONS)
+    key = models.PositiveBigIntegerField(default=0)
+    started = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    wip_delta = models.IntegerField(default=0)
+    cycle_time_seconds = models.BigIntegerField(default=0)
+    cycle_time_count = models.PositiveIntegerField(default=0)
+    lead_time_seconds = models.BigIntegerField(default=0)
+    lead_time_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'dimension', 'key', 'day'], name='flow_rollup_board_unique_day'),
+        ]
+        indexes = [
+            models.Index(fields=['board', 'dimension', 'day'], name='flow_rollup_board_dim_day_idx'),
+        ]
+
+
+class ArchivedTask(models.Model):
+    """A done task moved out of kanban_task by archive_done_tasks; keeps its original id."""
+    id = models.BigIntegerField(primary_key=True)
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='archived_tasks', db_index=False)
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, default='done')
+    assignee = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='archived_tasks')
+    due_date = models.DateField()
+    labels = models.ManyToManyField(Label, blank=True, related_name='archived_tasks')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', 'created_at'], name='archived_board_created_idx'),
+            models.Index(fields=['board', 'updated_at'], name='archived_board_updated_idx'),
+        ]
+
+    def attachment_count(self):
+        return 0  # placeholder, as on Task
+
+    def comment_count(self):
+        return 0  # placeholder, as on Task
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='comments')
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    content = models.TextField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+
+class ArchivedAttachment(models.Model):
+    """Attachment metadata only; the stored file stays where it was uploaded."""
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='attachments')
+    uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    file = models.FileField(upload_to=attachment_upload_path)
+    original_name = models.CharField(max_length=255)
+    uploaded_at = models.DateTimeField()
+
+    def name(self):
+        return os.path.basename(self.file.name)
+
+    def type(self):
+        return mimetypes.guess_type(self.original_name or self.file.name)[0] or ""
+
+    def size(self):
+        return self.file.size if self.file else 0
+
+    def url(self):
+        return self.file.url
+
+
+class AuthRevocation(models.Model):
+    """
+    Deny list shared by every worker's CachedJWTAuthentication: an access
+    token revoked at logout (jti), or a user whose cached copy must be dropped
+    everywhere (user_id). A row is only needed until expires_at.
+    """
+    jti = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+
+class StatCounter(models.Model):
+    """Named running totals, e.g. how many tasks have been archived."""
+    name = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def value_of(cls, name):
+        return cls.objects.filter(name=name).values_list('value', flat=True).first() or 0
+
+    @classmethod
+    def add(cls, name, amount):
+        if not cls.objects.filter(name=name).update(value=models.F('value') + amount):
+            counter, created = cls.objects.get_or_create(name=name, defaults={'value': amount})
+            if not created:
+                cls.objects.filter(name=name).update(value=models.F('value') + amount)
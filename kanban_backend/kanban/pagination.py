@@ -0,0 +1,18 @@
+import base64
+from datetime import datetime
+
+from rest_framework.exceptions import ValidationError
+
+
+def encode_cursor(created_at, pk):
+    """Opaque keyset cursor for (created_at, id) ordered lists."""
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, param='cursor'):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError({param: "Invalid cursor."})
@@ -0,0 +1,227 @@
+"""
+On-demand request profiling.
+
+ProfilingMiddleware profiles a request when a staff user sends
+``X-Profile: 1`` or when it is picked at PROFILE_SAMPLE_RATE. A profiled
+request records:
+
+* a cProfile of the request thread (function totals, readable with pstats),
+* the request thread's stack sampled every PROFILE_SAMPLE_INTERVAL seconds,
+  kept as collapsed stacks for flamegraph.pl / speedscope,
+* the SQL timeline: offset, duration and statement of every query.
+
+Results are written to PROFILE_DIR as <id>.prof and <id>.json and only the
+newest PROFILE_KEEP are kept. The response carries the id in X-Profile-Id.
+Async views run outside the thread the profiler watches, so profile their
+sync counterparts instead. Only one request per process is profiled at a
+time: from Python 3.12 cProfile uses sys.monitoring, which allows a single
+active profiler, so a request that would overlap another is not profiled.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from .authentication import CachedJWTAuthentication
+
+PROFILE_HEADER = 'X-Profile'
+# Held while a request is being profiled in this process.
+_active = threading.Lock()
+re_profile_id = re.compile(r'[0-9TZ]+-[0-9a-f]+')
+
+
+def profile_dir():
+    return Path(settings.PROFILE_DIR)
+
+
+def _is_staff(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return result is not None and result[0].is_staff
+
+
+def trigger_for(request):
+    """Why this request should be profiled ("header" / "sampled"), or None."""
+    if request.headers.get(PROFILE_HEADER) in ('1', 'true') and _is_staff(request):
+        return 'header'
+    if settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return 'sampled'
+    return None
+
+
+def _frame_name(frame):
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}"
+
+
+class StackSampler(threading.Thread):
+    """Collect collapsed stacks of another thread by polling sys._current_frames()."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='kanban-profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class QueryTimeline:
+    """A connection.execute_wrapper that records when each query ran and for how long."""
+
+    def __init__(self, started):
+        self.started = started
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "alias": context['connection'].alias,
+                "offsetMs": round((start - self.started) * 1000, 3),
+                "durationMs": round((time.perf_counter() - start) * 1000, 3),
+                "sql": sql,
+                "many": many,
+            })
+
+
+class RequestProfile:
+    def __init__(self, trigger):
+        self.trigger = trigger
+        self.id = f"{timezone.now():%Y%m%dT%H%M%S%fZ}-{uuid.uuid4().hex[:8]}"
+
+    def start(self):
+        """Start profiling; False, with nothing started, if another profile is running."""
+        if not _active.acquire(blocking=False):
+            return False
+        self.profiler = cProfile.Profile()
+        try:
+            self.profiler.enable()
+        except ValueError:  # a profiler we do not own is active (e.g. a debugger)
+            _active.release()
+            return False
+        self.started = time.perf_counter()
+        self.timeline = QueryTimeline(self.started)
+        self.connections = list(connections.all())
+        for connection in self.connections:
+            connection.execute_wrappers.append(self.timeline)
+        self.sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL)
+        self.sampler.start()
+        return True
+
+    def finish(self, request, response):
+        try:
+            self.profiler.disable()
+            duration = time.perf_counter() - self.started
+            self.sampler.stop()
+            for connection in self.connections:
+                connection.execute_wrappers.remove(self.timeline)
+        finally:
+            _active.release()
+
+        user = getattr(request, 'user', None)
+        meta = {
+            "id": self.id,
+            "createdAt": timezone.now().isoformat(),
+            "trigger": self.trigger,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "user": user.get_username() if user is not None and user.is_authenticated else None,
+            "durationMs": round(duration * 1000, 3),
+            "sqlCount": len(self.timeline.queries),
+            "sqlMs": round(sum(query['durationMs'] for query in self.timeline.queries), 3),
+            "sampleIntervalMs": settings.PROFILE_SAMPLE_INTERVAL * 1000,
+            "sql": self.timeline.queries,
+            "stacks": dict(self.sampler.stacks),
+        }
+        save_profile(meta, self.profiler)
+        return self.id
+
+
+def save_profile(meta, profiler):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(directory / f"{meta['id']}.prof")
+    # Write the metadata last: list_profiles only sees complete profiles.
+    tmp = directory / f"{meta['id']}.json.tmp"
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, directory / f"{meta['id']}.json")
+    rotate(settings.PROFILE_KEEP)
+
+
+def rotate(keep):
+    """Delete all but the newest `keep` profiles."""
+    for path in sorted(profile_dir().glob('*.json'), reverse=True)[keep:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.prof').unlink(missing_ok=True)
+
+
+def list_profiles():
+    """Profile summaries, newest first (ids sort by time)."""
+    summaries = []
+    for path in sorted(profile_dir().glob('*.json'), reverse=True):
+        try:
+            meta = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        meta.pop('sql', None)
+        meta.pop('stacks', None)
+        summaries.append(meta)
+    return summaries
+
+
+def _path(profile_id, suffix):
+    if not re_profile_id.fullmatch(profile_id):
+        raise FileNotFoundError(profile_id)
+    return profile_dir() / f"{profile_id}{suffix}"
+
+
+def load_profile(profile_id):
+    return json.loads(_path(profile_id, '.json').read_text())
+
+
+def function_stats(profile_id, limit=40, sort='cumulative'):
+    """The cProfile table for a profile, as pstats prints it."""
+    out = io.StringIO()
+    stats = pstats.Stats(str(_path(profile_id, '.prof')), stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def collapsed_stacks(meta):
+    """Brendan Gregg's collapsed format: "frame;frame;frame count" per line."""
+    return ''.join(f"{stack} {count}\n" for stack, count in sorted(meta['stacks'].items()))
@@ -1,6 +1,7 @@
 from datetime import datetime
 from rest_framework import serializers
 from .models import *
+from .boards import is_member
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
 User = get_user_model()
@@ -41,14 +42,66 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'color', 'avatar', 'date_joined']
         read_only_fields = ['id', 'date_joined']
 
+class BoardSerializer(serializers.ModelSerializer):
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+
+    class Meta:
+        model = Board
+        fields = ['id', 'name', 'createdAt']
+
 class LabelSerializer(serializers.ModelSerializer):
+    boardId = serializers.PrimaryKeyRelatedField(source='board', read_only=True)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
 
     class Meta:
         model = Label
-        fields = ['id', 'name', 'color', 'createdAt']
-
-class TaskSerializer(serializers.ModelSerializer):
+        fields = ['id', 'boardId', 'name', 'color', 'createdAt']
+
+def _split_param(value):
+    return {part.strip() for part in value.split(',') if part.strip()} if value else set()
+
+
+class SparseFieldsMixin:
+    """
+    Let read requests trim the payload with ``?fields=a,b`` or ``?omit=c``.
+    ``id`` is always rendered and write-only fields are never touched.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        self.requested_fields = set()
+        self.omitted_fields = set()
+        self.compact = False
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        params = getattr(request, 'query_params', request.GET)
+        self.requested_fields = _split_param(params.get('fields'))
+        self.omitted_fields = _split_param(params.get('omit'))
+        self.compact = params.get('compact') in ('1', 'true')
+        for name in list(self.fields):
+            field = self.fields[name]
+            if name != 'id' and not field.write_only and not self.wants(name):
+                self.fields.pop(name)
+
+    def wants(self, name):
+        if name in self.omitted_fields:
+            return False
+        return not self.requested_fields or name in self.requested_fields
+
+
+def label_dictionary(tasks):
+    """One entry per distinct label across `tasks`, for compact responses."""
+    labels = {}
+    for task in tasks:
+        for label in task.labels.all():
+            if label.id not in labels:
+                labels[label.id] = LabelSerializer(label).data
+    return labels
+
+
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    boardId = serializers.PrimaryKeyRelatedField(source='board', read_only=True)
     assigneeId = serializers.PrimaryKeyRelatedField(
         source='assignee', queryset=CustomUser.objects.all(), write_only=True, required=False, allow_null=True 
     )
@@ -64,11 +117,60 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = [
-            'id', 'title', 'description', 'status', 'assigneeId', 'assigneeName',
+            'id', 'boardId', 'title', 'description', 'status', 'assigneeId', 'assigneeName',
             'due_date', 'created_at', 'updated_at', 'labelIds', 'labels',
-            'attachmentCount', 'commentCount'
+            'attachmentCount', 'commentCount', 'version'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at', 'version']
+
+    # Output field -> model column that can be left out of the SELECT when not rendered.
+    DEFERRABLE_COLUMNS = {
+        'title': 'title',
+        'description': 'description',
+        'status': 'status',
+        'due_date': 'due_date',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'version': 'version',
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Compact mode references labels by id; the view sends each label once.
+        self.render_label_ids = self.compact and self.fields.pop('labels', None) is not None
+        self.render_assignee_id = self.compact and self.wants('assigneeId')
+
+    def narrow_queryset(self, queryset):
+        """Only load the columns and relations this serializer will actually render."""
+        deferred = [column for name, column in self.DEFERRABLE_COLUMNS.items() if name not in self.fields]
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        if 'assigneeName' not in self.fields:
+            queryset = queryset.select_related(None)
+        if 'labels' not in self.fields and not self.render_label_ids:
+            queryset = queryset.prefetch_related(None)
+        return queryset
+
+    def validate(self, attrs):
+        # New tasks get their board from the view (context["board_id"]).
+        board_id = self.instance.board_id if self.instance is not None else self.context.get('board_id')
+        if board_id is not None:
+            if any(label.board_id != board_id for label in attrs.get('labels', ())):
+                raise serializers.ValidationError({'labelIds': "Labels must belong to the task's board."})
+            assignee = attrs.get('assignee')
+            if assignee is not None and not is_member(assignee.pk, board_id):
+                raise serializers.ValidationError({'assigneeId': "Assignee is not a member of the task's board."})
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.render_assignee_id:
+            data['assigneeId'] = instance.assignee_id
+        if self.render_label_ids:
+            data['labelIds'] = [label.id for label in instance.labels.all()]
+        if isinstance(instance, ArchivedTask):
+            data['archived'] = True
+        return data
 
     def get_attachmentCount(self, obj):
         return obj.attachment_count()
@@ -123,15 +225,18 @@ class AttachmentSerializer(serializers.ModelSerializer):
         return obj.size()
     
 class ActivityLogSerializer(serializers.ModelSerializer):
+    boardId = serializers.PrimaryKeyRelatedField(source='board', read_only=True)
     userId = serializers.PrimaryKeyRelatedField(source='user', read_only=True)
     userName = serializers.CharField(source='user.username', read_only=True)
-    taskId = serializers.PrimaryKeyRelatedField(source='task', read_only=True)
-    taskTitle = serializers.CharField(source='task.title', read_only=True)
+    # The id stays meaningful after the task is archived or deleted.
+    taskId = serializers.IntegerField(source='task_id', read_only=True)
+    # Annotated by archive.with_task_titles; None once the task is deleted.
+    taskTitle = serializers.CharField(source='task_title', read_only=True)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
 
     class Meta:
         model = ActivityLog
         fields = [
-            'id', 'type', 'message', 'userId', 'userName',
+            'id', 'boardId', 'type', 'message', 'userId', 'userName',
             'taskId', 'taskTitle', 'from_status', 'to_status', 'createdAt'
         ]
\ No newline at end of file
@@ -0,0 +1,32 @@
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from kanban.models import Board, BoardMembership, CustomUser, Label, Task
+
+
+class KanbanTestCase(TestCase):
+    """A board with one member, logged in on ``self.client``."""
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.board = Board.objects.create(name='Team')
+        self.user = self.create_user('ann')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_user(self, username, board=None):
+        user = CustomUser.objects.create_user(username=username, email=f'{username}@example.com', password='pw')
+        BoardMembership.objects.create(board=board or self.board, user=user)
+        return user
+
+    def create_label(self, name, board=None):
+        return Label.objects.create(board=board or self.board, name=name, color='#ff0000')
+
+    def create_task(self, title='Write tests', board=None, labels=(), **fields):
+        task = Task.objects.create(
+            board=board or self.board, title=title, description='Notes', due_date='2026-01-01', **fields,
+        )
+        task.labels.set(labels)
+        return task
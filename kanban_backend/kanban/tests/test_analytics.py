@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from kanban.analytics import rebuild_rollups
+from kanban.models import ActivityLog, FlowDailyRollup
+
+from .base import KanbanTestCase
+
+
+class FlowRollupTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bob = self.create_user('bob')
+
+    def create(self, title):
+        response = self.client.post(
+            '/api/tasks', {'title': title, 'description': 'Notes', 'due_date': '2026-01-01'}, format='json',
+        )
+        return response.json()['data']['id']
+
+    def move(self, task_id, status):
+        self.client.patch(f'/api/tasks/{task_id}/status', {'status': status}, format='json')
+
+    def work_through(self, count):
+        for number in range(count):
+            task_id = self.create(f'Task {number}')
+            self.move(task_id, 'inprogress')
+            self.client.patch(f'/api/tasks/{task_id}/assignee', {'assigneeId': self.bob.pk}, format='json')
+            self.move(task_id, 'done')
+        doomed = self.create('Dropped')
+        self.move(doomed, 'inprogress')
+        self.client.delete(f'/api/tasks/{doomed}')
+
+    def snapshot(self):
+        return sorted(FlowDailyRollup.objects.values_list(
+            'board_id', 'dimension', 'key', 'day', 'started', 'completed', 'wip_delta',
+            'cycle_time_count', 'lead_time_count',
+        ))
+
+    def test_rebuild_matches_the_incremental_rollup(self):
+        self.work_through(3)
+        incremental = self.snapshot()
+        bob = [row for row in incremental if row[1:3] == ('assignee', self.bob.pk)]
+        self.assertEqual(bob[0][4:7], (0, 3, 0))  # completed while assigned to bob, no WIP left
+
+        rebuild_rollups()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_rebuild_queries_do_not_grow_with_tasks(self):
+        self.work_through(2)
+        with CaptureQueriesContext(connection) as few:
+            rebuild_rollups()
+        self.work_through(6)
+        with CaptureQueriesContext(connection) as many:
+            rebuild_rollups()
+        self.assertEqual(len(many), len(few))
+
+    def test_rebuild_since_uses_starts_before_the_window(self):
+        task_id = self.create('Long running')
+        self.move(task_id, 'inprogress')
+        self.move(task_id, 'done')
+        yesterday = timezone.now() - timedelta(days=1)
+        ActivityLog.objects.filter(task_id=task_id).exclude(to_status='done').update(created_at=yesterday)
+        rebuild_rollups()
+        expected = self.snapshot()
+
+        rebuild_rollups(since=timezone.localdate())
+        self.assertEqual(self.snapshot(), expected)
+        done = FlowDailyRollup.objects.get(dimension='all', day=timezone.localdate())
+        self.assertEqual(done.cycle_time_count, 1)
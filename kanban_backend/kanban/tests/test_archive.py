@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from kanban.archive import archive_done_tasks
+from kanban.models import ActivityLog, Attachment, Board
+
+from .base import KanbanTestCase
+
+
+class ArchivedTaskTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.task = self.create_task(title='Shipped', status='done')
+        self.attachment = Attachment.objects.create(
+            task=self.task, uploaded_by=self.user, original_name='notes.txt',
+            file=default_storage.save('attachments/notes.txt', ContentFile(b'hello')),
+        )
+        self.log(self.task, 3)
+        archive_done_tasks(days=0)
+
+    def log(self, task, count):
+        for _ in range(count):
+            ActivityLog.objects.create(board=self.board, task_id=task.pk, user=self.user, type='task_updated', message='m')
+
+    def get_archived(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/tasks/{self.task.pk}', {'include_archived': '1', 'expand': 'activity'})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['data']['activity'], len(queries)
+
+    def test_archived_activity_titles_do_not_cost_a_query_per_row(self):
+        activity, few = self.get_archived()
+        self.assertEqual({entry['taskTitle'] for entry in activity}, {'Shipped'})
+        self.log(self.task, 5)
+        activity, many = self.get_archived()
+        self.assertEqual(len(activity), 8)
+        self.assertEqual(many, few)
+
+    def test_dashboard_activity_titles_live_archived_and_deleted_tasks(self):
+        live = self.create_task(title='Still open')
+        self.log(live, 1)
+        deleted = self.create_task(title='Gone')
+        self.log(deleted, 1)
+        deleted_id = deleted.pk
+        deleted.delete()
+
+        response = self.client.get('/api/dashboard/activity')
+        titles = {entry['taskId']: entry['taskTitle'] for entry in response.json()['data']}
+        self.assertEqual(titles, {self.task.pk: 'Shipped', live.pk: 'Still open', deleted_id: None})
+
+    def test_archived_attachment_downloads(self):
+        response = self.client.get(f'/api/attachments/{self.attachment.pk}/download')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'hello')
+        self.assertIn('notes.txt', response['Content-Disposition'])
+
+    def test_archived_attachment_download_requires_membership(self):
+        self.client.force_authenticate(self.create_user('eve', board=Board.objects.create(name='Other')))
+        response = self.client.get(f'/api/attachments/{self.attachment.pk}/download')
+        self.assertEqual(response.status_code, 404)
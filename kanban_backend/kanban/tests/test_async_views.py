@@ -0,0 +1,49 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.test import AsyncClient, TransactionTestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from kanban.models import Board, BoardMembership, CustomUser, Task
+
+
+class AsyncParityTests(TransactionTestCase):
+    """The async endpoints answer like their sync counterparts (queries run on other threads, hence committed data)."""
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        board = Board.objects.create(name='Team')
+        self.user = CustomUser.objects.create_user(username='ann', email='ann@example.com', password='pw')
+        BoardMembership.objects.create(board=board, user=self.user)
+        for title, description in [
+            ('Fix login bug', 'Users get logged out'),
+            ('Login page', 'New design for the bug tracker'),
+            ('Write docs', 'Explain the login flow'),
+        ]:
+            Task.objects.create(board=board, title=title, description=description, due_date='2026-01-01')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.async_client = AsyncClient()
+        self.auth = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    async def get_both(self, path, params):
+        sync_response = await sync_to_async(self.client.get)(path, params)
+        self.assertEqual(sync_response.status_code, 200, sync_response.content)
+        async_response = await self.async_client.get(
+            f'/api/async{path.removeprefix("/api")}', params, headers=self.auth,
+        )
+        self.assertEqual(async_response.status_code, 200, async_response.content)
+        return sync_response.json(), async_response.json()
+
+    async def test_task_search_terms_match_the_sync_list(self):
+        for search in ('login bug', 'login', '"login bug"', 'docs,login', 'nothing'):
+            with self.subTest(search=search):
+                sync_body, async_body = await self.get_both('/api/tasks', {'search': search})
+                titles = sorted(task['title'] for task in sync_body['results']['data'])
+                self.assertEqual(sorted(task['title'] for task in async_body['results']['data']), titles)
+                self.assertEqual(async_body['count'], sync_body['count'])
+
+    async def test_two_terms_must_both_match(self):
+        _, body = await self.get_both('/api/tasks', {'search': 'login bug'})
+        self.assertEqual(sorted(task['title'] for task in body['results']['data']), ['Fix login bug', 'Login page'])
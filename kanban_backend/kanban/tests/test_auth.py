@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from kanban.models import AuthRevocation
+
+from .base import KanbanTestCase
+
+
+class CachedAuthenticationTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post('/api/auth/login', {'email': 'ann@example.com', 'password': 'pw'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        tokens = response.json()['data']
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['token']}")
+        return tokens
+
+    def test_cached_user_needs_no_user_query(self):
+        self.login()
+        self.assertEqual(self.client.get('/api/auth/me').status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/auth/me').status_code, 200)
+        user_queries = [q['sql'] for q in queries.captured_queries if 'FROM "kanban_customuser"' in q['sql']]
+        self.assertEqual(user_queries, [])
+
+    def test_logout_revokes_the_access_token(self):
+        tokens = self.login()
+        self.assertEqual(self.client.get('/api/auth/me').status_code, 200)
+
+        response = self.client.post('/api/auth/logout', {'refreshToken': tokens['refreshToken']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(AuthRevocation.objects.filter(jti__isnull=False).exists())
+        self.assertEqual(self.client.get('/api/auth/me').status_code, 401)
+
+    def test_deactivated_user_is_rejected_at_once(self):
+        self.login()
+        self.assertEqual(self.client.get('/api/auth/me').status_code, 200)  # now in the user cache
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertTrue(AuthRevocation.objects.filter(user_id=self.user.pk).exists())
+        self.assertEqual(self.client.get('/api/auth/me').status_code, 401)
+
+    def test_last_login_does_not_invalidate(self):
+        self.login()
+        self.assertFalse(AuthRevocation.objects.filter(user_id=self.user.pk).exists())
+
+
+class RegistrationTests(KanbanTestCase):
+    def register(self, email):
+        response = APIClient().post(
+            '/api/auth/register', {'username': email.split('@')[0], 'email': email, 'password': 'pw'}, format='json',
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['data']
+
+    def test_each_registrant_gets_their_own_board(self):
+        self.create_task(title='Team secret')
+        first, second = self.register('zoe@example.com'), self.register('yan@example.com')
+        boards = {}
+        for data in (first, second):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {data['token']}")
+            [board] = client.get('/api/boards').json()['data']
+            boards[data['user']['username']] = board
+            self.assertEqual(client.get('/api/tasks').json()['results']['data'], [])
+        self.assertEqual(boards['zoe']['name'], "zoe's board")
+        self.assertNotEqual(boards['zoe']['id'], boards['yan']['id'])
+        self.assertNotIn(self.board.pk, [board['id'] for board in boards.values()])
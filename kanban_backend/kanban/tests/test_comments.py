@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from kanban.models import Comment
+
+from .base import KanbanTestCase
+
+
+class CommentPaginationTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.create_task()
+        start = timezone.now() - timedelta(hours=1)
+        for n in range(7):
+            comment = Comment.objects.create(task=self.task, author=self.user, content=f'c{n}')
+            # Two comments share each timestamp, so the id breaks the tie.
+            Comment.objects.filter(pk=comment.pk).update(created_at=start + timedelta(minutes=n // 2))
+
+    def page(self, **params):
+        response = self.client.get(f'/api/tasks/{self.task.pk}/comments', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        return [comment['content'] for comment in body['data']], body
+
+    def test_latest_page_then_older_pages(self):
+        contents, body = self.page(limit=3)
+        self.assertEqual(contents, ['c4', 'c5', 'c6'])
+        self.assertTrue(body['hasMore'])
+        self.assertEqual(body['count'], 7)
+
+        contents, body = self.page(limit=3, before=body['before'])
+        self.assertEqual(contents, ['c1', 'c2', 'c3'])
+        contents, body = self.page(limit=3, before=body['before'])
+        self.assertEqual(contents, ['c0'])
+        self.assertFalse(body['hasMore'])
+        self.assertIsNone(body['before'])
+
+    def test_after_only_returns_newer_comments(self):
+        _, body = self.page(limit=3)
+        contents, polled = self.page(after=body['after'])
+        self.assertEqual(contents, [])
+        self.assertEqual(polled['after'], body['after'])
+
+        Comment.objects.create(task=self.task, author=self.user, content='new')
+        contents, polled = self.page(after=body['after'])
+        self.assertEqual(contents, ['new'])
+
+    def test_bad_cursor_and_limit_are_rejected(self):
+        url = f'/api/tasks/{self.task.pk}/comments'
+        self.assertEqual(self.client.get(url, {'before': 'junk'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 'ten'}).status_code, 400)
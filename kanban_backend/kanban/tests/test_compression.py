@@ -0,0 +1,43 @@
+import gzip
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from kanban import compression
+
+from .base import KanbanTestCase
+
+
+@override_settings(COMPRESSION_ENCODINGS=['gzip'], COMPRESSION_MIN_SIZE=0)
+class CompressionTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        for number in range(20):
+            self.create_task(title=f'Task {number}')
+
+    def test_gzip_response_decompresses_to_the_original(self):
+        plain = self.client.get('/api/tasks')
+        response = self.client.get('/api/tasks', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_gzip_header_is_padded_with_a_random_file_name(self):
+        data = b'{"searchQuery": "abc"}' * 50
+        lengths = {len(compression.CODECS['gzip'][0](data)) for _ in range(20)}
+        self.assertGreater(len(lengths), 1)
+        self.assertTrue(compression.CODECS['gzip'][0](data)[3] & gzip.FNAME)
+
+    def test_refused_encoding_is_not_used(self):
+        response = self.client.get('/api/tasks', HTTP_ACCEPT_ENCODING='gzip;q=0, *')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_auth_responses_are_never_compressed(self):
+        client = APIClient()
+        response = client.post(
+            '/api/auth/login', {'email': 'ann@example.com', 'password': 'pw'}, format='json',
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('token', response.json()['data'])
@@ -0,0 +1,61 @@
+from django.core.cache import caches
+from django.db import connections
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from kanban import db_router
+from kanban.models import Board, BoardMembership, CustomUser, Task
+
+# A second database for the replica, created and migrated by the test runner
+# like the default one. It is not kept in sync, so which rows a request sees
+# tells which database it read. (Registered at import, before the runner sets
+# up the test databases.)
+if 'replica' not in connections:
+    default = connections['default'].settings_dict
+    connections.settings['replica'] = {**default, 'TEST': {**default['TEST'], 'NAME': None, 'MIRROR': None}}
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        caches['shared'].clear()
+        for alias in ('default', 'replica'):
+            board = Board.objects.using(alias).create(pk=1, name='Team')
+            user = CustomUser.objects.db_manager(alias).create_user(
+                username='ann', email='ann@example.com', password='pw', pk=1,
+            )
+            BoardMembership.objects.using(alias).create(board=board, user=user)
+        self.user = CustomUser.objects.get(pk=1)
+        Task.objects.using('replica').create(board_id=1, title='Only on the replica', description='', due_date='2026-01-01')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def titles(self):
+        return [task['title'] for task in self.client.get('/api/tasks').json()['results']['data']]
+
+    def test_router_sends_writes_to_the_primary(self):
+        router = db_router.PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_write(Task), 'default')
+        self.assertEqual(router.db_for_read(Task), 'default')
+        with db_router.replica_reads():
+            self.assertEqual(router.db_for_read(Task), 'replica')
+            self.assertEqual(router.db_for_write(Task), 'default')
+
+    def test_list_reads_from_the_replica(self):
+        self.assertEqual(self.titles(), ['Only on the replica'])
+
+    def test_write_goes_to_the_primary_and_pins_the_next_read(self):
+        response = self.client.post(
+            '/api/tasks', {'title': 'Just written', 'description': 'Notes', 'due_date': '2026-01-01'}, format='json',
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertTrue(Task.objects.using('default').filter(title='Just written').exists())
+        self.assertFalse(Task.objects.using('replica').filter(title='Just written').exists())
+        self.assertEqual(self.titles(), ['Just written'])
+
+    def test_pin_expires(self):
+        self.client.post('/api/tasks', {'title': 'Just written', 'description': 'Notes', 'due_date': '2026-01-01'}, format='json')
+        caches['shared'].clear()
+        self.assertEqual(self.titles(), ['Only on the replica'])
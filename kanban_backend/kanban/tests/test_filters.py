@@ -0,0 +1,44 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from kanban.filters import LABEL_MATCH_ALL, filter_by_labels
+from kanban.models import Task
+
+from .base import KanbanTestCase
+
+
+class LabelFilterTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bug, self.ui, self.docs = (self.create_label(name) for name in ('bug', 'ui', 'docs'))
+        self.both = self.create_task('Both', labels=[self.bug, self.ui])
+        self.bug_only = self.create_task('Bug only', labels=[self.bug])
+        self.all_three = self.create_task('All three', labels=[self.bug, self.ui, self.docs])
+        self.unlabelled = self.create_task('None')
+
+    def titles(self, **params):
+        response = self.client.get('/api/tasks', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(task['title'] for task in response.json()['results']['data'])
+
+    def test_any_returns_each_task_once(self):
+        labels = f'{self.bug.pk},{self.ui.pk}'
+        self.assertEqual(self.titles(labels=labels), ['All three', 'Both', 'Bug only'])
+
+    def test_all_requires_every_label(self):
+        labels = f'{self.bug.pk},{self.ui.pk}'
+        self.assertEqual(self.titles(labels=labels, labelMatch='all'), ['All three', 'Both'])
+        labels = f'{self.bug.pk},{self.ui.pk},{self.docs.pk}'
+        self.assertEqual(self.titles(labels=labels, labelMatch='all'), ['All three'])
+
+    def test_all_is_semi_joins_without_distinct(self):
+        tasks = filter_by_labels(Task.objects.all(), [self.bug.pk, self.ui.pk, self.docs.pk], LABEL_MATCH_ALL)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(list(tasks), [self.all_three])
+        sql = queries.captured_queries[0]['sql'].upper()
+        self.assertNotIn('DISTINCT', sql)
+        self.assertEqual(sql.count('EXISTS'), 2)
+
+    def test_bad_parameters_are_rejected(self):
+        self.assertEqual(self.client.get('/api/tasks', {'labels': 'a,b'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/tasks', {'labels': self.bug.pk, 'labelMatch': 'some'}).status_code, 400)
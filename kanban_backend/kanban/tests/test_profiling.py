@@ -0,0 +1,44 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from kanban import profiling
+
+from .base import KanbanTestCase
+
+
+class ProfilingTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+        self.enterContext(override_settings(PROFILE_DIR=profile_dir, PROFILE_SAMPLE_RATE=0))
+        self.user.is_staff = True
+        self.user.save()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def get_profiled(self):
+        response = self.client.get('/api/tasks', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_staff_request_is_profiled(self):
+        profile_id = self.get_profiled()['X-Profile-Id']
+        meta = profiling.load_profile(profile_id)
+        self.assertEqual((meta['trigger'], meta['path']), ('header', '/api/tasks'))
+        self.assertIn('list', profiling.function_stats(profile_id))
+        self.assertFalse(profiling._active.locked())
+
+    def test_request_overlapping_another_profile_is_not_profiled(self):
+        profiling._active.acquire()  # another worker thread's request is being profiled
+        try:
+            self.assertFalse(profiling.RequestProfile('header').start())
+            response = self.get_profiled()
+            self.assertFalse(response.has_header('X-Profile-Id'))
+        finally:
+            profiling._active.release()
+        self.assertTrue(self.get_profiled().has_header('X-Profile-Id'))
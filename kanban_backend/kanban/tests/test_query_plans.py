@@ -0,0 +1,35 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from kanban.management.commands.explain_hot_queries import full_scans, hot_queries
+from kanban.models import ActivityLog, Attachment, Comment, CustomUser, Task
+
+
+class HotQueryPlanTests(TestCase):
+    """The explain_hot_queries check, run by ``manage.py test``."""
+
+    def test_hot_queries_use_indexes(self):
+        if connection.vendor == 'postgresql':
+            # Small tables make Postgres prefer a seq scan; we want to know whether an index *can* be used.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for name, queryset in hot_queries().items():
+            with self.subTest(query=name):
+                plan = queryset.explain()
+                self.assertEqual(full_scans(plan), [], plan)
+
+    @skipUnless(connection.vendor == 'sqlite', "SQLite NOCASE indexes from 0015/0016")
+    def test_admin_prefix_searches_use_indexes(self):
+        searches = {
+            'task_title': Task.objects.filter(title__istartswith='wri'),
+            'attachment_name': Attachment.objects.filter(original_name__istartswith='not'),
+            'user_email': CustomUser.objects.filter(email__istartswith='ann'),
+            'comment_author_email': Comment.objects.filter(author__email__istartswith='ann'),
+            'activity_user_email': ActivityLog.objects.filter(user__email__istartswith='ann'),
+        }
+        for name, queryset in searches.items():
+            with self.subTest(search=name):
+                plan = queryset.explain()
+                self.assertEqual(full_scans(plan), [], plan)
@@ -0,0 +1,48 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .base import KanbanTestCase
+
+
+class SparseFieldsTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        bug, ui = self.create_label('bug'), self.create_label('ui')
+        self.create_task('One', labels=[bug, ui], assignee=self.user)
+        self.create_task('Two', labels=[bug])
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results'], queries.captured_queries
+
+    def test_fields_keeps_only_the_requested_keys_and_columns(self):
+        results, queries = self.get(fields='title,status')
+        self.assertEqual({tuple(sorted(task)) for task in results['data']}, {('id', 'status', 'title')})
+        task_query = next(q['sql'] for q in queries if 'FROM "kanban_task"' in q['sql'] and 'COUNT' not in q['sql'])
+        self.assertNotIn('"description"', task_query)
+        self.assertNotIn('kanban_customuser', task_query)
+        self.assertFalse(any('kanban_task_labels' in q['sql'] for q in queries))
+
+    def test_omit_drops_keys(self):
+        results, _ = self.get(omit='description,labels')
+        task = results['data'][0]
+        self.assertNotIn('description', task)
+        self.assertNotIn('labels', task)
+        self.assertIn('title', task)
+
+    def test_compact_sends_each_label_once(self):
+        results, _ = self.get(compact='1')
+        by_title = {task['title']: task for task in results['data']}
+        self.assertNotIn('labels', by_title['One'])
+        self.assertEqual(len(by_title['One']['labelIds']), 2)
+        self.assertEqual(by_title['One']['assigneeId'], self.user.pk)
+        self.assertEqual(sorted(label['name'] for label in results['labels'].values()), ['bug', 'ui'])
+
+    def test_writes_ignore_sparse_parameters(self):
+        response = self.client.post('/api/tasks?fields=title', {
+            'title': 'Three', 'description': 'Notes', 'due_date': '2026-01-01',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertIn('description', response.json()['data'])
@@ -0,0 +1,59 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from kanban.models import ActivityLog, Attachment, Comment
+
+from .base import KanbanTestCase
+
+
+class ExpandTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.file_name = default_storage.save('attachments/a.txt', ContentFile(b'hello'))
+        self.task = self.create_task(labels=[self.create_label('bug')])
+        self.add_rows(3)
+
+    def add_rows(self, count):
+        for n in range(count):
+            Comment.objects.create(task=self.task, author=self.user, content=f'Comment {n}')
+            Attachment.objects.create(task=self.task, uploaded_by=self.user, file=self.file_name, original_name='a.txt')
+            ActivityLog.objects.create(board=self.board, task=self.task, user=self.user, type='task_updated', message='m')
+
+    def get(self, expand='comments,attachments,activity'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/tasks/{self.task.pk}', {'expand': expand})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['data'], len(queries)
+
+    def test_expanded_card_costs_a_fixed_number_of_queries(self):
+        _, plain = self.get(expand='')
+        data, expanded = self.get()
+        self.assertEqual(expanded, plain + 3)
+        self.assertEqual((len(data['comments']), len(data['attachments']), len(data['activity'])), (3, 3, 3))
+
+        self.add_rows(40)
+        data, busier = self.get()
+        self.assertEqual(busier, expanded)
+        self.assertEqual(len(data['comments']), 20)
+        self.assertEqual(len(data['activity']), 20)
+        self.assertIsNotNone(data['commentsCursor'])
+
+    def test_comments_are_oldest_first_and_cursor_pages_back(self):
+        data, _ = self.get(expand='comments')
+        self.assertEqual([comment['content'] for comment in data['comments']], ['Comment 0', 'Comment 1', 'Comment 2'])
+        self.assertIsNone(data['commentsCursor'])
+        self.assertNotIn('attachments', data)
+
+    def test_unknown_expansions_are_ignored(self):
+        data, _ = self.get(expand='comments,secrets')
+        self.assertIn('comments', data)
+        self.assertNotIn('secrets', data)
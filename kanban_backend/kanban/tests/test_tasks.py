@@ -0,0 +1,127 @@
+from unittest import mock
+
+from django.db.models import F
+
+from kanban.models import ActivityLog, Board, Task
+from kanban.views import TaskDetailView
+
+from .base import KanbanTestCase
+
+
+class VersionConflictTests(KanbanTestCase):
+    def test_status_update_with_stale_if_match_is_refused(self):
+        task = self.create_task()
+        response = self.client.patch(f'/api/tasks/{task.pk}/status', {'status': 'inprogress'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+
+        response = self.client.patch(
+            f'/api/tasks/{task.pk}/status', {'status': 'done'}, format='json', HTTP_IF_MATCH='"1"',
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], 2)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.version), ('inprogress', 2))
+
+    def test_status_update_with_current_if_match_applies(self):
+        task = self.create_task()
+        response = self.client.patch(
+            f'/api/tasks/{task.pk}/status', {'status': 'done'}, format='json', HTTP_IF_MATCH='W/"1"',
+        )
+        self.assertEqual(response.status_code, 200)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.version), ('done', 2))
+
+    def test_status_updates_log_the_status_they_replaced(self):
+        response = self.client.post(
+            '/api/tasks', {'title': 'Logged', 'description': 'Notes', 'due_date': '2026-01-01'}, format='json',
+        )
+        task_id = response.json()['data']['id']
+        for status in ('inprogress', 'done'):
+            self.client.patch(f'/api/tasks/{task_id}/status', {'status': status}, format='json')
+        transitions = ActivityLog.objects.filter(task_id=task_id).order_by('id').values_list('from_status', 'to_status')
+        self.assertEqual(list(transitions), [(None, 'todo'), ('todo', 'inprogress'), ('inprogress', 'done')])
+
+    def test_put_with_stale_if_match_is_refused(self):
+        task = self.create_task()
+        Task.objects.filter(pk=task.pk).update(version=3)
+        response = self.client.patch(f'/api/tasks/{task.pk}', {'title': 'Renamed'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 409)
+        task.refresh_from_db()
+        self.assertEqual(task.title, 'Write tests')
+
+    def test_put_loses_to_a_write_between_its_read_and_update(self):
+        task = self.create_task()
+        get_object = TaskDetailView.get_object
+
+        def read_then_someone_writes(view):
+            instance = get_object(view)
+            Task.objects.filter(pk=task.pk).update(title='Theirs', version=F('version') + 1)
+            return instance
+
+        with mock.patch.object(TaskDetailView, 'get_object', read_then_someone_writes):
+            response = self.client.patch(f'/api/tasks/{task.pk}', {'title': 'Mine'}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], 2)
+        task.refresh_from_db()
+        self.assertEqual((task.title, task.version), ('Theirs', 2))
+
+    def test_put_applies_fields_and_labels_in_one_version(self):
+        task = self.create_task()
+        label = self.create_label('bug')
+        response = self.client.patch(
+            f'/api/tasks/{task.pk}', {'title': 'Renamed', 'labelIds': [label.pk]}, format='json', HTTP_IF_MATCH='"1"',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assertEqual(response.json()['data']['labels'][0]['name'], 'bug')
+        task.refresh_from_db()
+        self.assertEqual((task.title, task.version), ('Renamed', 2))
+
+    def test_malformed_if_match_is_a_bad_request(self):
+        task = self.create_task()
+        response = self.client.patch(
+            f'/api/tasks/{task.pk}/status', {'status': 'done'}, format='json', HTTP_IF_MATCH='"abc"',
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class BoardScopingTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_board = Board.objects.create(name='Other team')
+        self.other_user = self.create_user('bob', board=self.other_board)
+        self.other_task = self.create_task(board=self.other_board, title='Not yours')
+
+    def test_task_list_only_shows_own_board(self):
+        self.create_task()
+        response = self.client.get('/api/tasks')
+        self.assertEqual([task['title'] for task in response.json()['results']['data']], ['Write tests'])
+
+    def test_other_boards_tasks_are_not_found(self):
+        self.assertEqual(self.client.get(f'/api/tasks/{self.other_task.pk}').status_code, 404)
+        response = self.client.patch(f'/api/tasks/{self.other_task.pk}/status', {'status': 'done'}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(f'/api/tasks/{self.other_task.pk}/comments').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/tasks?board={self.other_board.pk}').status_code, 404)
+
+    def test_labels_and_assignees_must_be_on_the_tasks_board(self):
+        other_label = self.create_label('bug', board=self.other_board)
+        response = self.client.post('/api/tasks', {
+            'title': 'New', 'description': 'Notes', 'due_date': '2026-01-01', 'labelIds': [other_label.pk],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('labelIds', response.json())
+
+        task = self.create_task()
+        response = self.client.patch(f'/api/tasks/{task.pk}/assignee', {'assigneeId': self.other_user.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_numeric_ids_are_bad_requests(self):
+        task = self.create_task()
+        self.assertEqual(
+            self.client.patch(f'/api/tasks/{task.pk}/assignee', {'assigneeId': 'abc'}, format='json').status_code, 400,
+        )
+        self.assertEqual(
+            self.client.post(f'/api/boards/{self.board.pk}/members', {'userId': 'abc'}, format='json').status_code, 400,
+        )
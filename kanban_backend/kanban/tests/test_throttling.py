@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from kanban import throttling
+
+from .base import KanbanTestCase
+
+
+class InFlightCounterTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = throttling.throttle_cache()
+
+    def test_slots_are_counted_and_given_back(self):
+        self.assertTrue(throttling.acquire_slot('slots', 2))
+        self.assertTrue(throttling.acquire_slot('slots', 2))
+        self.assertFalse(throttling.acquire_slot('slots', 2))
+        self.assertEqual(self.cache.get('slots'), 2)
+        throttling.release_slot('slots')
+        throttling.release_slot('slots')
+        self.assertEqual(self.cache.get('slots'), 0)
+
+    def test_release_never_goes_below_zero(self):
+        throttling.release_slot('slots')  # expired: nothing to give back
+        self.cache.set('slots', 0)
+        throttling.release_slot('slots')
+        self.assertEqual(self.cache.get('slots'), 0)
+
+
+class TokenBucketTests(KanbanTestCase):
+    def take(self, cost, now, capacity=10, rate=1):
+        return throttling.take_tokens('bucket', cost, capacity, rate, now)
+
+    def test_bucket_drains_and_refills_at_the_rate(self):
+        self.assertEqual(self.take(4, 100), 0)
+        self.assertEqual(self.take(4, 100), 0)
+        self.assertEqual(self.take(4, 100), 2)  # 2 tokens left, 2 more needed at 1/s
+        self.assertEqual(self.take(4, 102), 0)
+        self.assertEqual(self.take(1, 102), 1)
+
+    def test_idle_time_does_not_bank_more_than_the_capacity(self):
+        self.assertEqual(self.take(10, 100), 0)
+        self.assertEqual(self.take(10, 108), 2)
+        self.assertEqual(self.take(10, 140), 0)  # 40s earned, but the bucket only holds 10
+        self.assertEqual(self.take(5, 140), 5)
+
+    def test_concurrent_requests_cannot_overspend(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            waits = list(pool.map(lambda _: self.take(1, 100), range(50)))
+        self.assertEqual(waits.count(0), 10)
+
+
+class ThrottleSettingsTests(SimpleTestCase):
+    def load_settings(self, **env):
+        return subprocess.run(
+            [sys.executable, '-c', 'import kanban_project.settings'],
+            cwd=settings.BASE_DIR, env={**os.environ, **env}, capture_output=True, text=True,
+        )
+
+    def test_rates_must_be_positive(self):
+        result = self.load_settings(KANBAN_THROTTLE_USER_RATE='0')
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('ImproperlyConfigured', result.stderr)
+        self.assertEqual(self.load_settings(KANBAN_THROTTLE_ANON_RATE='0.1').returncode, 0)
+
+
+@override_settings(THROTTLE_USER_BURST=10, THROTTLE_USER_RATE=0.01, THROTTLE_ANON_BURST=10, THROTTLE_ANON_RATE=0.01)
+class ThrottleTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        throttling.stats.reset()
+
+    def test_expensive_views_spend_more_tokens(self):
+        codes = [self.client.get('/api/search/global', {'q': 'x'}).status_code for _ in range(3)]
+        self.assertIn(429, codes)
+        response = self.client.get('/api/search/global', {'q': 'x'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    @override_settings(THROTTLE_USER_BURST=120)
+    def test_in_flight_slots_are_released_after_the_response(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/search/tasks').status_code, 200)
+        self.assertEqual(throttling.throttle_cache().get('throttle:inflight'), 0)
+        self.assertEqual(throttling.throttle_cache().get(f'throttle:inflight:user:{self.user.pk}'), 0)
+
+    def test_full_server_sheds_with_503(self):
+        throttling.throttle_cache().set('throttle:inflight', 16)
+        with self.settings(EXPENSIVE_REQUEST_LIMIT=16):
+            response = self.client.get('/api/search/tasks')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(throttling.throttle_cache().get(f'throttle:inflight:user:{self.user.pk}'), 0)
+        self.assertEqual(throttling.stats.snapshot()['totalShed'], 1)
+
+    def test_client_over_its_in_flight_limit_gets_429(self):
+        throttling.throttle_cache().set(f'throttle:inflight:user:{self.user.pk}', 2)
+        with self.settings(EXPENSIVE_REQUEST_CLIENT_LIMIT=2):
+            response = self.client.get('/api/search/tasks')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(throttling.throttle_cache().get('throttle:inflight', 0), 0)
+
+    def test_forwarded_for_does_not_pick_the_bucket(self):
+        anonymous = APIClient()
+        codes = [
+            anonymous.post('/api/auth/login', {'email': 'ann@example.com', 'password': 'bad'}, format='json',
+                           HTTP_X_FORWARDED_FOR=f'10.0.0.{i}').status_code
+            for i in range(3)
+        ]
+        self.assertEqual(codes[-1], 429)
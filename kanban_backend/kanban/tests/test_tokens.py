@@ -0,0 +1,59 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from kanban.management.commands.prune_tokens import prune_expired_tokens
+from kanban.models import AuthRevocation, CustomUser
+
+
+class PruneTokensTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ann', email='ann@example.com', password='pw')
+        now = timezone.now()
+        for n in range(5):
+            token = OutstandingToken.objects.create(
+                user=self.user, jti=f'expired-{n}', token='t', created_at=now - timedelta(days=2),
+                expires_at=now - timedelta(days=1),
+            )
+            BlacklistedToken.objects.create(token=token)
+        self.live = OutstandingToken.objects.create(
+            user=self.user, jti='live', token='t', created_at=now, expires_at=now + timedelta(days=1),
+        )
+
+    def test_expired_tokens_go_in_batches_with_their_blacklist_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(prune_expired_tokens(batch_size=2), 5)
+        batches = [q['sql'] for q in queries.captured_queries if 'LIMIT 2' in q['sql']]
+        self.assertEqual(len(batches), 4)  # 2 + 2 + 1, then an empty batch
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_command_also_prunes_revocations(self):
+        now = timezone.now()
+        AuthRevocation.objects.create(jti='old', expires_at=now - timedelta(minutes=1))
+        AuthRevocation.objects.create(jti='current', expires_at=now + timedelta(minutes=1))
+        out = StringIO()
+        call_command('prune_tokens', batch_size=2, stdout=out)
+        self.assertIn('Pruned 5 expired tokens and 1 expired revocations', out.getvalue())
+        self.assertEqual(list(AuthRevocation.objects.values_list('jti', flat=True)), ['current'])
+
+
+class FastHasherTests(TestCase):
+    @override_settings(
+        PASSWORD_HASHERS=['kanban.hashers.TunedPBKDF2PasswordHasher', 'django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+        PASSWORD_HASHER_ITERATIONS=1000,
+    )
+    def test_tuned_iterations_and_old_hashes_still_verify(self):
+        encoded = make_password('pw')
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(check_password('pw', encoded))
+
+        with self.settings(PASSWORD_HASHER_ITERATIONS=2000):
+            self.assertTrue(check_password('pw', encoded))
@@ -0,0 +1,58 @@
+from django.utils import timezone
+
+from kanban import typeahead
+from kanban.models import Board, BoardMembership, CustomUser
+
+from .base import KanbanTestCase
+
+
+class PrefixIndexTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        typeahead.user_index.invalidate()
+        typeahead.label_index.invalidate()
+
+    def search_users(self, query, limit=10):
+        response = self.client.get('/api/typeahead/users', {'q': query, 'limit': limit})
+        return [user['username'] for user in response.json()['data']['results']]
+
+    def test_other_boards_cannot_crowd_out_a_match(self):
+        crowded = Board.objects.create(name='Crowded')
+        users = CustomUser.objects.bulk_create(
+            CustomUser(username=f'aa{number:04}', email=f'aa{number:04}@example.com') for number in range(2500)
+        )
+        BoardMembership.objects.bulk_create(BoardMembership(board=crowded, user=user) for user in users)
+        self.create_user('abby')
+
+        self.assertEqual(self.search_users('a'), ['ann', 'abby'])
+
+    def test_matches_are_ranked_before_the_limit(self):
+        for username in ('zed.alpha', 'alexander', 'al'):
+            self.create_user(username)
+        self.assertEqual(self.search_users('al', limit=2), ['al', 'alexander'])
+        self.assertEqual(self.search_users('alpha'), ['zed.alpha'])
+
+    def test_labels_are_scoped_to_the_board(self):
+        other = Board.objects.create(name='Other')
+        self.create_label('bug', board=other)
+        self.create_label('backend')
+        response = self.client.get('/api/typeahead/labels', {'q': 'b'})
+        self.assertEqual([label['name'] for label in response.json()['data']['results']], ['backend'])
+
+    def test_logins_keep_the_index(self):
+        typeahead.user_index.warm()
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=['last_login'])
+        self.assertIsNotNone(typeahead.user_index._boards)
+
+        self.user.username = 'annie'
+        self.user.save()
+        self.assertIsNone(typeahead.user_index._boards)
+        self.assertEqual(self.search_users('ann'), ['annie'])
+
+    def test_joining_a_board_refreshes_the_index(self):
+        other = Board.objects.create(name='Other')
+        newcomer = self.create_user('nina', board=other)
+        self.assertEqual(self.search_users('ni'), [])
+        BoardMembership.objects.create(board=self.board, user=newcomer)
+        self.assertEqual(self.search_users('ni'), ['nina'])
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.test import override_settings
+
+from kanban import compression, warmup
+
+from .base import KanbanTestCase
+
+
+@override_settings(COLD_START_REQUESTS=2)
+class ColdStartStatsTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stats = warmup.ColdStartStats()
+
+    def test_first_requests_are_kept_apart_from_later_ones(self):
+        for endpoint, duration in (('/api/tasks', 30.0), ('/api/labels', 10.0), ('/api/tasks', 4.0), ('/api/tasks', 2.0)):
+            self.stats.record(endpoint, duration)
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot['firstRequests'], [
+            {"endpoint": '/api/tasks', "durationMs": 30.0}, {"endpoint": '/api/labels', "durationMs": 10.0},
+        ])
+        self.assertEqual((snapshot['firstRequestMs'], snapshot['firstRequestsAvgMs']), (30.0, 20.0))
+        self.assertEqual((snapshot['laterRequests'], snapshot['laterRequestsAvgMs']), (2, 3.0))
+
+    def test_reset_starts_a_new_record(self):
+        self.stats.record('/api/tasks', 5.0)
+        self.stats.reset()
+        snapshot = self.stats.snapshot()
+        self.assertEqual((snapshot['firstRequests'], snapshot['laterRequests']), ([], 0))
+        self.assertIsNone(snapshot['firstRequestMs'])
+
+    def test_metrics_report_this_process(self):
+        warmup.stats.reset()
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get('/api/tasks')
+        cold_start = self.client.get('/api/metrics').json()['data']['coldStart']
+        self.assertEqual(cold_start['firstRequests'][0]['endpoint'], '/api/tasks')
+
+
+class WarmUpTests(KanbanTestCase):
+    def test_warm_up_times_every_step_and_forgets_its_own_request(self):
+        with mock.patch.object(connections, 'close_all') as close_all:
+            timings = warmup.warm_up(WSGIHandler())
+        self.assertEqual(set(timings), {'database', 'urls', 'serializers', 'typeahead', 'firstRequest'})
+        self.assertEqual(warmup.stats.warmup, timings)
+        # Connections must not cross the fork; the warm-up request is not a real first request.
+        close_all.assert_called_once_with()
+        self.assertEqual(warmup.stats.snapshot()['firstRequests'], [])
+        self.assertEqual(compression.stats.snapshot()['endpoints'], {})
+
+    def test_after_fork_starts_the_workers_own_record(self):
+        warmup.stats.record('/api/tasks', 5.0)
+        with mock.patch('os.getpid', return_value=4242):
+            warmup.after_fork()
+        snapshot = warmup.stats.snapshot()
+        self.assertEqual((snapshot['pid'], snapshot['firstRequests']), (4242, []))
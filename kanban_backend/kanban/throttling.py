@@ -0,0 +1,236 @@
+"""
+Admission control for the API.
+
+TokenBucketThrottle gives every client (the user id, or the IP for anonymous
+requests) a token bucket of THROTTLE_*_BURST tokens refilled at
+THROTTLE_*_RATE tokens a second. A request spends its view's
+``throttle_cost`` (1 unless the view says otherwise), so a global search
+drains the bucket much faster than a task fetch. An empty bucket answers
+429 with Retry-After.
+
+ConcurrencyLimitMixin caps how many expensive requests (search, analytics)
+run at once: EXPENSIVE_REQUEST_CLIENT_LIMIT per client, answered with 429,
+and EXPENSIVE_REQUEST_LIMIT overall, answered with 503. Both carry
+Retry-After.
+
+Buckets and in-flight counters live in the THROTTLE_CACHE cache alias. The
+default local-memory cache limits each worker process on its own; point it
+at a shared backend to limit the whole deployment. Both are updated with
+cache add/incr only, so concurrent requests cannot overwrite each other's
+charges. Counts of admitted, throttled and shed requests
+are kept per view in process memory and reported by /api/metrics.
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.throttling import BaseThrottle
+
+
+def throttle_cache():
+    return caches[settings.THROTTLE_CACHE]
+
+
+def client_key(request, ident):
+    # `ident` is DRF's get_ident: REMOTE_ADDR unless NUM_PROXIES says which
+    # X-Forwarded-For entry to trust.
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return f'ip:{ident}'
+
+
+# The spent counter holds thousandths of a token, so fractional refills stay integers for incr.
+SCALE = 1000
+
+
+def take_tokens(key, cost, capacity, rate, now=None):
+    """
+    Spend `cost` tokens from the bucket `key`; returns 0 if admitted, else seconds to wait.
+
+    A bucket is an epoch and a counter of tokens spent since it, kept under a
+    key named after the epoch, so the counter only ever moves by incr/decr.
+    The tokens earned since the epoch are (now - epoch) * rate, and the bucket
+    is short by spent - earned.
+    """
+    cache = throttle_cache()
+    now = time.time() if now is None else now
+    # The entries can expire once the bucket would be full again anyway.
+    ttl = math.ceil(capacity / rate) + 1
+    base = f'throttle:bucket:{key}'
+    cache.add(f'{base}:epoch', now, ttl)
+    epoch = cache.get(f'{base}:epoch', now)
+    spent_key = f'{base}:{epoch!r}'
+    cost = round(min(cost, capacity) * SCALE)
+    try:
+        spent = cache.incr(spent_key, cost)
+    except ValueError:
+        cache.add(spent_key, 0, ttl)
+        spent = cache.incr(spent_key, cost)
+    cache.touch(f'{base}:epoch', ttl)
+    cache.touch(spent_key, ttl)
+
+    earned = int((now - epoch) * rate * SCALE)
+    short = spent - earned
+    if short > capacity * SCALE:
+        cache.decr(spent_key, cost)  # not admitted: give the tokens back
+        return (short - capacity * SCALE) / (rate * SCALE)
+    if short < cost and cache.add(f'{base}:clamp', 1, 1):
+        # Idle time beyond a full bucket must not bank tokens: charge it as
+        # spent. One request at a time does this, against a fresh count.
+        try:
+            short = cache.incr(spent_key, 0) - earned
+            if short < cost:
+                cache.incr(spent_key, cost - short)
+        finally:
+            cache.delete(f'{base}:clamp')
+    return 0
+
+
+def acquire_slot(key, limit):
+    """Count one more request in flight under `key` unless `limit` are running already."""
+    cache = throttle_cache()
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, settings.EXPENSIVE_REQUEST_TTL)
+        count = cache.incr(key)
+    # Counters expire so that a worker killed mid-request cannot hold slots
+    # forever; every acquire pushes the expiry back while the key is in use.
+    cache.touch(key, settings.EXPENSIVE_REQUEST_TTL)
+    if count > limit:
+        release_slot(key)
+        return False
+    return True
+
+
+def release_slot(key):
+    cache = throttle_cache()
+    try:
+        count = cache.decr(key)
+    except ValueError:
+        return  # expired while the request ran
+    if count < 0:
+        # The counter expired and was recreated while this request ran; do
+        # not let it go below zero and hand out extra slots.
+        cache.incr(key, -count)
+
+
+class Overloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The server is busy, try again shortly.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+
+class ThrottleStats:
+    """
+    Per-view counters, kept in process memory: requests that passed the rate
+    check and the tokens they spent, and requests refused with 429
+    (throttled) or 503 (shed).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = defaultdict(lambda: {'admitted': 0, 'throttled': 0, 'shed': 0, 'tokens': 0})
+
+    def record(self, view, outcome, tokens=0):
+        with self._lock:
+            entry = self._data[view]
+            entry[outcome] += 1
+            entry['tokens'] += tokens
+
+    def snapshot(self):
+        with self._lock:
+            views = {view: dict(entry) for view, entry in self._data.items()}
+        cache = throttle_cache()
+        return {
+            'cache': settings.THROTTLE_CACHE,
+            'inFlight': cache.get('throttle:inflight', 0),
+            'inFlightLimit': settings.EXPENSIVE_REQUEST_LIMIT,
+            'views': views,
+            'totalThrottled': sum(entry['throttled'] for entry in views.values()),
+            'totalShed': sum(entry['shed'] for entry in views.values()),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+
+stats = ThrottleStats()
+
+
+def check_rate(request, ident, view_name, cost):
+    """Charge the request to its client's bucket; raises Throttled when it is empty."""
+    if getattr(request, 'user', None) is not None and request.user.is_authenticated:
+        capacity, rate = settings.THROTTLE_USER_BURST, settings.THROTTLE_USER_RATE
+    else:
+        capacity, rate = settings.THROTTLE_ANON_BURST, settings.THROTTLE_ANON_RATE
+    wait = take_tokens(client_key(request, ident), cost, capacity, rate)
+    if wait:
+        stats.record(view_name, 'throttled')
+        raise Throttled(math.ceil(wait))
+    stats.record(view_name, 'admitted', cost)
+
+
+def enter_expensive(request, ident, view_name):
+    """
+    Take a per-client and a global in-flight slot, or raise Throttled (429)
+    / Overloaded (503). Returns the keys to hand to leave_expensive.
+    """
+    client = f'throttle:inflight:{client_key(request, ident)}'
+    if not acquire_slot(client, settings.EXPENSIVE_REQUEST_CLIENT_LIMIT):
+        stats.record(view_name, 'throttled')
+        raise Throttled(settings.EXPENSIVE_REQUEST_RETRY_AFTER)
+    if not acquire_slot('throttle:inflight', settings.EXPENSIVE_REQUEST_LIMIT):
+        release_slot(client)
+        stats.record(view_name, 'shed')
+        raise Overloaded(settings.EXPENSIVE_REQUEST_RETRY_AFTER)
+    return (client, 'throttle:inflight')
+
+
+def leave_expensive(keys):
+    for key in keys:
+        release_slot(key)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """DRF throttle charging each request the view's ``throttle_cost``."""
+
+    def allow_request(self, request, view):
+        try:
+            check_rate(request, self.get_ident(request), type(view).__name__, getattr(view, 'throttle_cost', 1))
+        except Throttled as exc:
+            self._wait = exc.wait
+            return False
+        return True
+
+    def wait(self):
+        return self._wait
+
+
+class ConcurrencyLimitMixin:
+    """
+    Limit how many requests to this view run at once. The slot is taken after
+    authentication and the rate check and given back with the response.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        request._inflight = enter_expensive(request, BaseThrottle().get_ident(request), type(self).__name__)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        keys = getattr(request, '_inflight', None)
+        if keys:
+            request._inflight = None
+            leave_expensive(keys)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,170 @@
+"""
+Top-K typeahead for the assignee and label pickers.
+
+On PostgreSQL lookups are served by pg_trgm GIN indexes on UPPER(column)
+(migration 0008), which is exactly what Django's icontains/istartswith
+compile to, and ranked prefix matches first, then by trigram similarity.
+Other databases use PrefixIndex: a sorted, in-memory index of lower-cased
+names and the words in them, kept per process and rebuilt after a user or
+label changes or TYPEAHEAD_INDEX_TTL seconds, whichever comes first. It is
+keyed by board, so a lookup only ever sees the requested board's rows.
+"""
+import bisect
+import re
+import threading
+import time
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections, router
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.exceptions import ValidationError
+
+from .models import BoardMembership, CustomUser, Label
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+re_word = re.compile(r'\w+')
+
+
+def parse_limit(raw, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    if raw in (None, ''):
+        return default
+    try:
+        return min(max(int(raw), 1), maximum)
+    except ValueError:
+        raise ValidationError({'limit': "Expected an integer."})
+
+
+class PrefixIndex:
+    """
+    Per-board sorted (key, kind, pk) entries answering "which rows on this
+    board have a name or a word starting with q" with a bisect. `load` yields
+    (board_id, pk, names) with the primary name first. Results rank a match on
+    the primary name, then on another name, then on an inner word; shorter
+    keys first within each.
+    """
+    PRIMARY, SECONDARY, WORD = range(3)
+
+    def __init__(self, load, ttl):
+        self._load = load
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._boards = None
+        self._built_at = 0
+
+    def warm(self):
+        self._index()
+
+    def invalidate(self):
+        with self._lock:
+            self._boards = None
+
+    def _index(self):
+        with self._lock:
+            if self._boards is None or time.monotonic() - self._built_at > self.ttl:
+                entries = defaultdict(set)
+                for board_id, pk, names in self._load():
+                    for position, name in enumerate(names):
+                        if not name:
+                            continue
+                        name = name.lower()
+                        entries[board_id].add((name, self.PRIMARY if position == 0 else self.SECONDARY, pk))
+                        for word in re_word.findall(name)[1:]:
+                            entries[board_id].add((word, self.WORD, pk))
+                self._boards = {}
+                for board_id, board_entries in entries.items():
+                    board_entries = sorted(board_entries)
+                    self._boards[board_id] = ([entry[0] for entry in board_entries], board_entries)
+                self._built_at = time.monotonic()
+            return self._boards
+
+    def lookup(self, board_id, query, limit=None):
+        query = query.lower()
+        keys, entries = self._index().get(board_id, ([], []))
+        best = {}
+        # Every match on the board is ranked before the limit applies.
+        for key, kind, pk in islice(entries, bisect.bisect_left(keys, query), None):
+            if not key.startswith(query):
+                break
+            score = (kind, len(key), key)
+            if pk not in best or score < best[pk]:
+                best[pk] = score
+        ranked = sorted(best.items(), key=lambda item: item[1])
+        return [pk for pk, _ in ranked[:limit]]
+
+
+def _load_users():
+    memberships = BoardMembership.objects.values_list('board_id', 'user_id', 'user__username', 'user__email')
+    for board_id, pk, username, email in memberships.iterator():
+        yield board_id, pk, [username, email]
+
+
+def _load_labels():
+    for board_id, pk, name in Label.objects.values_list('board_id', 'pk', 'name').iterator():
+        yield board_id, pk, [name]
+
+
+ttl = getattr(settings, 'TYPEAHEAD_INDEX_TTL', 300)
+user_index = PrefixIndex(_load_users, ttl)
+label_index = PrefixIndex(_load_labels, ttl)
+
+
+@receiver(post_save, sender=CustomUser)
+def _invalidate_saved_user(update_fields=None, **kwargs):
+    # Logins only touch last_login, which the index does not hold.
+    if set(update_fields or ()) != {'last_login'}:
+        user_index.invalidate()
+
+
+@receiver(post_delete, sender=CustomUser)
+@receiver([post_save, post_delete], sender=BoardMembership)
+def _invalidate_users(**kwargs):
+    user_index.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Label)
+def _invalidate_labels(**kwargs):
+    label_index.invalidate()
+
+
+def _trigram_search(queryset, fields, query, limit):
+    matches = Q.create([(f'{field}__icontains', query) for field in fields], connector=Q.OR)
+    prefix = Q.create([(f'{field}__istartswith', query) for field in fields], connector=Q.OR)
+    similarities = [TrigramSimilarity(field, query) for field in fields]
+    return list(
+        queryset.filter(matches)
+        .annotate(
+            prefix_rank=Case(When(prefix, then=Value(0)), default=Value(1), output_field=IntegerField()),
+            similarity=Greatest(*similarities) if len(similarities) > 1 else similarities[0],
+        )
+        .order_by('prefix_rank', '-similarity', 'pk')[:limit]
+    )
+
+
+def _search(queryset, index, fields, board_id, query, limit):
+    query = query.strip()
+    if not query:
+        return []
+    if connections[router.db_for_read(queryset.model)].vendor == 'postgresql':
+        return _trigram_search(queryset, fields, query, limit)
+    ids = index.lookup(board_id, query, limit)
+    # The queryset drops rows the index still holds after a change it has not seen yet.
+    rows = queryset.in_bulk(ids)
+    return [rows[pk] for pk in ids if pk in rows]
+
+
+def search_users(board_id, query, limit=DEFAULT_LIMIT):
+    """Members of the board matching `query`."""
+    members = CustomUser.objects.filter(board_memberships__board_id=board_id)
+    return _search(members, user_index, ('username', 'email'), board_id, query, limit)
+
+
+def search_labels(board_id, query, limit=DEFAULT_LIMIT):
+    return _search(Label.objects.filter(board_id=board_id), label_index, ('name',), board_id, query, limit)
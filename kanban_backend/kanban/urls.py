@@ -1,5 +1,6 @@
 from django.urls import path
 from .views import *
+from . import async_views
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
@@ -12,6 +13,9 @@ urlpatterns = [
     path('api/users', UserListView.as_view()),
     path('api/users/<int:pk>', UserDetailView.as_view()),
 
+    path('api/boards', BoardListCreateView.as_view()),
+    path('api/boards/<int:pk>/members', BoardMemberView.as_view()),
+
     path('api/tasks', TaskListCreateView.as_view()),
     path('api/tasks/<int:pk>', TaskDetailView.as_view()),
     path('api/tasks/<int:pk>/status', TaskStatusUpdateView.as_view()),
@@ -30,9 +34,25 @@ urlpatterns = [
     path('api/dashboard/stats', DashboardStatsView.as_view()),
     path('api/dashboard/activity', DashboardActivityView.as_view()),
     path('api/tasks/analytics', TaskAnalyticsView.as_view()),
+    path('api/tasks/analytics/flow', FlowAnalyticsView.as_view()),
 
     path('api/search/tasks', TaskSearchView.as_view()),
     path('api/search/users', UserSearchView.as_view()),
     path('api/search/global', GlobalSearchView.as_view()),
+
+    path('api/typeahead/users', UserTypeaheadView.as_view()),
+    path('api/typeahead/labels', LabelTypeaheadView.as_view()),
+
+    path('api/metrics', MetricsView.as_view()),
+
+    # Async variants of the hot read endpoints for ASGI deployments.
+    path('api/async/tasks', async_views.task_list),
+    path('api/async/tasks/<int:pk>', async_views.task_detail),
+    path('api/async/tasks/analytics', async_views.task_analytics),
+    path('api/async/dashboard/stats', async_views.dashboard_stats),
+    path('api/async/dashboard/activity', async_views.dashboard_activity),
+    path('api/async/search/tasks', async_views.task_search),
+    path('api/async/search/users', async_views.user_search),
+    path('api/async/search/global', async_views.global_search),
 ]
 
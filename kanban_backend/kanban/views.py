@@ -1,21 +1,97 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, generics, filters
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from django.http import FileResponse, Http404
 from rest_framework.permissions import IsAuthenticated
-from django.utils.timezone import now, timedelta
-from django.db.models import Count, Q
+from django.utils.timezone import now, timedelta, make_aware
+from datetime import datetime, time
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
 
 from .models import *
 from .serializers import *
+from . import compression, db_router, throttling, typeahead, warmup
+from .boards import create_personal_board, member_filter, resolve_board
+from .analytics import (
+    counted_state, flow_metrics, record_status_change, record_task_deleted, record_wip_move, task_rollup_keys,
+)
+from .archive import archived_counter, archived_task_search_queryset, wants_archived, with_task_titles
+from .authentication import revoke_access_token
+from .filters import LABEL_MATCH_ANY, filter_by_labels, parse_id_list
+from .pagination import decode_cursor, encode_cursor
+from .throttling import ConcurrencyLimitMixin
 
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
+def start_of_week(day):
+    monday = day - timedelta(days=day.weekday())
+    return make_aware(datetime.combine(monday, time.min))
+
+def task_etag(task):
+    return f'"{task.version}"'
+
+
+def if_match_version(request):
+    """
+    The task version the client based its write on, from ``If-Match: "3"``
+    (weak validators are accepted, as compressed responses carry them).
+    None when the header is absent or ``*``.
+    """
+    header = request.headers.get('If-Match', '').strip()
+    if not header or header == '*':
+        return None
+    try:
+        return int(header.removeprefix('W/').strip('"'))
+    except ValueError:
+        raise ValidationError({"If-Match": "Expected a task version, e.g. \"3\"."})
+
+
+class VersionedTaskUpdateMixin:
+    """
+    Apply a small change to a task as one UPDATE, before reading it.
+
+    With If-Match the UPDATE only lands if the task is still at that version,
+    otherwise the client gets a 409 with the current version. The hook logs
+    the change against the state the rollup last counted (counted_state),
+    read after the UPDATE inside the same transaction, so concurrent writers
+    are logged in the order their UPDATEs landed.
+    """
+
+    def load_task(self, pk):
+        tasks = Task.objects.filter(**member_filter(self.request.user))
+        return get_object_or_404(tasks.select_related('assignee').prefetch_related('labels'), pk=pk)
+
+    def conflict(self, task):
+        response = Response({"error": "Task was changed by someone else", "version": task.version}, status=409)
+        response['ETag'] = task_etag(task)
+        return response
+
+    def task_response(self, task):
+        response = Response({"success": True, "data": TaskSerializer(task).data})
+        response['ETag'] = task_etag(task)
+        return response
+
+    def apply(self, request, pk, fields, on_success=None):
+        expected = if_match_version(request)
+        tasks = Task.objects.filter(pk=pk, **member_filter(request.user))
+        with transaction.atomic():
+            if not versioned_update(tasks, expected, **fields):
+                # Not on the caller's boards (404), or moved on from If-Match.
+                return self.conflict(self.load_task(pk))
+            task = self.load_task(pk)
+            if on_success is not None:
+                on_success(task, counted_state(task))
+        return self.task_response(task)
+
+
 def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
     return {
@@ -23,20 +99,29 @@ def get_tokens_for_user(user):
         'refreshToken': str(refresh),
     }
 
-class RegisterView(APIView):
-    def post(self, request):
-        print("METHOD:", request.method)
-        print("DATA RECEIVED:", request.data)
+class ReplicaReadMixin:
+    """Serve safe requests from a read replica unless the caller wrote recently."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with db_router.replica_reads(False):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in permissions.SAFE_METHODS and not db_router.is_pinned_to_primary(request):
+            db_router.replica_reads_allowed.set(True)
 
-        print("📥 Incoming Registration Data:", request.data)  # Log incoming JSON
 
+class RegisterView(APIView):
+    throttle_cost = 10
+
+    def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
+            with transaction.atomic():
+                user = serializer.save()
+                create_personal_board(user)
             tokens = get_tokens_for_user(user)
-
-            print("✅ User registered successfully:", user.email)
-
             return Response({
                 'success': True,
                 'data': {
@@ -44,12 +129,12 @@ class RegisterView(APIView):
                     **tokens
                 }
             }, status=status.HTTP_201_CREATED)
-
-        print("❌ Registration failed with errors:", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         
 class LoginView(APIView):
+    throttle_cost = 5
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
@@ -72,6 +157,8 @@ class LogoutView(APIView):
             refresh_token = request.data["refreshToken"]
             token = RefreshToken(refresh_token)
             token.blacklist()
+            if request.auth is not None:
+                revoke_access_token(request.auth)
             return Response({"success": True, "message": "Logged out"}, status=200)
         except Exception:
             return Response({"error": "Invalid token"}, status=400)
@@ -92,7 +179,12 @@ class MeView(APIView):
 class UserListView(generics.ListAPIView):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
-    permission_classes = [AllowAny]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_cost = 2
+
+    def get_queryset(self):
+        # The members of the requested board, i.e. the people tasks can be assigned to.
+        return super().get_queryset().filter(board_memberships__board_id=resolve_board(self.request))
 
     def list(self, request):
         users = self.get_queryset()
@@ -126,88 +218,259 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 
-class TaskListCreateView(generics.ListCreateAPIView):
+class BoardListCreateView(generics.ListCreateAPIView):
+    serializer_class = BoardSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Board.objects.filter(memberships__user=self.request.user).order_by('id')
+
+    def list(self, request):
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return Response({"success": True, "data": serializer.data})
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        if serializer.is_valid():
+            with transaction.atomic():
+                board = serializer.save()
+                BoardMembership.objects.create(board=board, user=request.user)
+            return Response({"success": True, "data": serializer.data}, status=201)
+        return Response(serializer.errors, status=400)
+
+
+class BoardMemberView(APIView):
+    """List a board's members or add one; only members can do either."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_board(self, request, pk):
+        return get_object_or_404(Board.objects.filter(memberships__user=request.user), pk=pk)
+
+    def get(self, request, pk):
+        board = self.get_board(request, pk)
+        members = CustomUser.objects.filter(board_memberships__board=board).order_by('id')
+        return Response({"success": True, "data": UserSerializer(members, many=True).data})
+
+    def post(self, request, pk):
+        board = self.get_board(request, pk)
+        try:
+            user_id = int(request.data.get('userId'))
+        except (TypeError, ValueError):
+            return Response({"error": "userId must be an integer"}, status=400)
+        user = CustomUser.objects.filter(pk=user_id).first()
+        if user is None:
+            return Response({"error": "User not found"}, status=400)
+        BoardMembership.objects.get_or_create(board=board, user=user)
+        return Response({"success": True, "data": UserSerializer(user).data}, status=201)
+
+
+class TaskListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
     queryset = Task.objects.select_related('assignee').prefetch_related('labels').all()
     serializer_class = TaskSerializer
-    permission_classes = [AllowAny]
+    permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['status', 'assignee']
     search_fields = ['title', 'description']
+    throttle_cost = 2
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        labels = self.request.GET.get('labels')
-        if labels:
-            label_ids = labels.split(',')
-            queryset = queryset.filter(labels__id__in=label_ids).distinct()
-        return queryset
+        queryset = super().get_queryset().filter(board_id=resolve_board(self.request))
+        label_ids = parse_id_list(self.request.GET.get('labels'))
+        return filter_by_labels(queryset, label_ids, self.request.GET.get('labelMatch', LABEL_MATCH_ANY))
 
     def list(self, request):
-        queryset = self.paginate_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return self.get_paginated_response({
-            "success": True,
-            "data": serializer.data
-        })
+        queryset = self.get_serializer().narrow_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        body = {"success": True, "data": serializer.data}
+        if serializer.child.render_label_ids:
+            body["labels"] = label_dictionary(page)
+        return self.get_paginated_response(body)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == 'POST':
+            context['board_id'] = resolve_board(self.request)
+        return context
 
     def create(self, request):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                task = serializer.save(board_id=serializer.context['board_id'])
+                record_status_change(task, None, task.status, request.user, 'task_created', f"{task.title} created")
             return Response({"success": True, "data": serializer.data}, status=201)
         return Response(serializer.errors, status=400)
 
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetailView(VersionedTaskUpdateMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Task.objects.select_related('assignee').prefetch_related('labels')
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    # ?expand=comments,attachments,activity embeds the card's side panels.
+    # Each one is a single bounded prefetch, so an expanded card costs a fixed
+    # number of queries no matter how busy the task is.
+    EXPANDABLE = ('comments', 'attachments', 'activity')
+    expand_comments_limit = 20
+    expand_attachments_limit = 50
+    expand_activity_limit = 20
+
+    def get_expand(self):
+        requested = self.request.GET.get('expand', '')
+        return [part for part in self.EXPANDABLE if part in requested.split(',')]
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(**member_filter(self.request.user))
+        if self.request.method != 'GET':
+            return queryset
+        expand = self.get_expand()
+        if 'comments' in expand:
+            queryset = queryset.prefetch_related(Prefetch(
+                'comments',
+                queryset=Comment.objects.select_related('author')
+                .order_by('-created_at', '-id')[:self.expand_comments_limit + 1],
+                to_attr='latest_comments',
+            ))
+        if 'attachments' in expand:
+            queryset = queryset.prefetch_related(Prefetch(
+                'attachments',
+                queryset=Attachment.objects.select_related('uploaded_by')
+                .order_by('-uploaded_at', '-id')[:self.expand_attachments_limit],
+                to_attr='latest_attachments',
+            ))
+        if 'activity' in expand:
+            queryset = queryset.prefetch_related(Prefetch(
+                'activitylog_set',
+                queryset=with_task_titles(ActivityLog.objects.select_related('user'))
+                .order_by('-created_at', '-id')[:self.expand_activity_limit],
+                to_attr='latest_activity',
+            ))
+        return queryset
+
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
+        try:
+            instance = self.get_object()
+        except Http404:
+            if not wants_archived(request.GET):
+                raise
+            return self.retrieve_archived(kwargs['pk'])
         serializer = self.get_serializer(instance)
-        return Response({"success": True, "data": serializer.data})
+        data = serializer.data
+        expand = self.get_expand()
+        if 'comments' in expand:
+            comments = instance.latest_comments[:self.expand_comments_limit]
+            has_more = len(instance.latest_comments) > self.expand_comments_limit
+            # Oldest first for display; the cursor pages further back from the oldest shown.
+            data['comments'] = CommentSerializer(reversed(comments), many=True).data
+            data['commentsCursor'] = encode_cursor(comments[-1].created_at, comments[-1].pk) if has_more else None
+        if 'attachments' in expand:
+            data['attachments'] = AttachmentSerializer(instance.latest_attachments, many=True).data
+        if 'activity' in expand:
+            data['activity'] = ActivityLogSerializer(instance.latest_activity, many=True).data
+        response = Response({"success": True, "data": data})
+        response['ETag'] = task_etag(instance)
+        return response
+
+    def retrieve_archived(self, pk):
+        archived = ArchivedTask.objects.filter(**member_filter(self.request.user))
+        instance = get_object_or_404(archived.select_related('assignee').prefetch_related('labels'), pk=pk)
+        data = self.get_serializer(instance).data
+        expand = self.get_expand()
+        if 'comments' in expand:
+            comments = instance.comments.select_related('author').order_by('-created_at', '-id')
+            data['comments'] = CommentSerializer(reversed(comments[:self.expand_comments_limit]), many=True).data
+            data['commentsCursor'] = None
+        if 'attachments' in expand:
+            attachments = instance.attachments.select_related('uploaded_by').order_by('-uploaded_at', '-id')
+            data['attachments'] = AttachmentSerializer(attachments[:self.expand_attachments_limit], many=True).data
+        if 'activity' in expand:
+            # The rows keep the task's id; the title comes from the archived copy.
+            activity = with_task_titles(ActivityLog.objects.filter(task_id=instance.pk).select_related('user'))
+            data['activity'] = ActivityLogSerializer(
+                activity.order_by('-created_at', '-id')[:self.expand_activity_limit], many=True,
+            ).data
+        return Response({"success": True, "data": data})
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
+        expected = if_match_version(request)
+        if expected is not None and instance.version != expected:
+            return self.conflict(instance)
+        previous_status = instance.status
+        previous_keys = task_rollup_keys(instance)
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({"success": True, "data": serializer.data})
-        return Response(serializer.errors, status=400)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        fields = dict(serializer.validated_data)
+        labels = fields.pop('labels', None)
+        with transaction.atomic():
+            # Only lands if nobody wrote since we read `instance`, so the
+            # previous status and keys logged below are the ones replaced.
+            if not instance.update_if_version(instance.version, **fields):
+                return self.conflict(Task.objects.get(pk=instance.pk))
+            if labels is not None:
+                instance.labels.set(labels)
+            # Any WIP move happens in the old status, before the transition.
+            record_wip_move(instance, previous_keys, request.user, previous_status)
+            record_status_change(instance, previous_status, instance.status, request.user)
+        response = Response({"success": True, "data": serializer.data})
+        response['ETag'] = task_etag(instance)
+        return response
 
     def destroy(self, request, *args, **kwargs):
-        self.get_object().delete()
+        task = self.get_object()
+        with transaction.atomic():
+            record_task_deleted(task, request.user)
+            task.delete()
         return Response({"success": True, "message": "Task deleted"})
 
 
-class TaskStatusUpdateView(APIView):
+class TaskStatusUpdateView(VersionedTaskUpdateMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def patch(self, request, pk):
-        task = Task.objects.get(pk=pk)
-        task.status = request.data.get('status', task.status)
-        task.save()
-        return Response({"success": True, "data": TaskSerializer(task).data})
+        new_status = request.data.get('status')
+        if new_status not in dict(Task.STATUS_CHOICES):
+            return Response({"error": "status must be one of todo, inprogress, done"}, status=400)
+
+        def log_transition(task, counted):
+            record_status_change(task, counted[0] if counted else None, task.status, request.user)
+
+        return self.apply(request, pk, {'status': new_status}, log_transition)
 
 
-class TaskAssigneeUpdateView(APIView):
+class TaskAssigneeUpdateView(VersionedTaskUpdateMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def patch(self, request, pk):
-        task = Task.objects.get(pk=pk)
         user_id = request.data.get('assigneeId')
-        if user_id:
-            task.assignee_id = user_id
-            task.save()
-        return Response({"success": True, "data": TaskSerializer(task).data})
+        if not user_id:
+            return self.task_response(self.load_task(pk))
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return Response({"error": "assigneeId must be an integer"}, status=400)
+        # One query checks both that the user exists and that they are on the task's board.
+        assignee = CustomUser.objects.filter(pk=user_id, board_memberships__board__tasks__pk=pk).first()
+        if assignee is None:
+            return Response({"error": "Assignee not found on this task's board"}, status=400)
+
+        def log_move(task, counted):
+            if counted is not None:
+                record_wip_move(task, counted[1], request.user, counted[0])
+
+        return self.apply(request, pk, {'assignee': assignee}, log_move)
     
 
 class LabelListCreateView(generics.ListCreateAPIView):
     queryset = Label.objects.all()
     serializer_class = LabelSerializer
-    permission_classes = [AllowAny]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(board_id=resolve_board(self.request))
 
     def list(self, request):
         labels = self.get_queryset()
@@ -217,7 +480,7 @@ class LabelListCreateView(generics.ListCreateAPIView):
     def create(self, request):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            label = serializer.save()
+            label = serializer.save(board_id=resolve_board(request))
             return Response({"success": True, "data": self.get_serializer(label).data}, status=201)
         return Response(serializer.errors, status=400)
 
@@ -227,6 +490,9 @@ class LabelUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = LabelSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        return super().get_queryset().filter(**member_filter(self.request.user))
+
     def put(self, request, *args, **kwargs):
         label = self.get_object()
         serializer = self.get_serializer(label, data=request.data)
@@ -236,20 +502,73 @@ class LabelUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
         return Response(serializer.errors, status=400)
 
     def delete(self, request, *args, **kwargs):
-        self.get_object().delete()
+        label = self.get_object()
+        with transaction.atomic():
+            in_progress = list(label.task_set.filter(status='inprogress'))
+            previous_keys = {task.pk: task_rollup_keys(task) for task in in_progress}
+            label.delete()
+            for task in in_progress:
+                record_wip_move(task, previous_keys[task.pk], request.user)
         return Response({"success": True, "message": "Label deleted"})
     
 class TaskCommentListCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    default_limit = 50
+    max_limit = 200
+
     def get(self, request, task_id):
-        comments = Comment.objects.filter(task_id=task_id).select_related('author')
-        serializer = CommentSerializer(comments, many=True)
-        return Response({"success": True, "data": serializer.data})
+        """
+        Keyset-paginated comments, oldest first within a page.
+
+        With no cursor the latest page is returned. ``before`` pages back into
+        older comments and ``after`` fetches only comments newer than the cursor,
+        so polling a busy task costs one index range scan either way.
+        """
+        try:
+            limit = min(int(request.GET.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=400)
+        limit = max(limit, 1)
+
+        if not Task.objects.filter(pk=task_id, **member_filter(request.user)).exists():
+            return Response({"error": "Task not found"}, status=404)
+        task_comments = Comment.objects.filter(task_id=task_id)
+        comments = task_comments.select_related('author')
+        before = request.GET.get('before')
+        after = request.GET.get('after')
+
+        older_cursor = None
+        if after:
+            created_at, pk = decode_cursor(after, 'after')
+            comments = comments.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+            page = list(comments.order_by('created_at', 'id')[:limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit]
+        else:
+            if before:
+                created_at, pk = decode_cursor(before, 'before')
+                comments = comments.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+            page = list(comments.order_by('-created_at', '-id')[:limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit][::-1]
+            if has_more:
+                older_cursor = encode_cursor(page[0].created_at, page[0].pk)
+
+        newer_cursor = encode_cursor(page[-1].created_at, page[-1].pk) if page else after
+        return Response({
+            "success": True,
+            "data": CommentSerializer(page, many=True).data,
+            "count": task_comments.count(),
+            "hasMore": has_more,
+            # Pass "before" to load older comments and "after" to poll for new ones.
+            "before": older_cursor,
+            "after": newer_cursor,
+        })
 
     def post(self, request, task_id):
         try:
-            task = Task.objects.get(id=task_id)
+            task = Task.objects.get(id=task_id, **member_filter(request.user))
         except Task.DoesNotExist:
             return Response({"error": "Task not found"}, status=404)
 
@@ -264,6 +583,9 @@ class CommentUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        return super().get_queryset().filter(**member_filter(self.request.user, 'task__board'))
+
     def put(self, request, *args, **kwargs):
         comment = self.get_object()
         if comment.author != request.user:
@@ -278,9 +600,12 @@ class CommentUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     
 class TaskAttachmentListCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_cost = 3
 
     def get(self, request, task_id):
-        attachments = Attachment.objects.filter(task_id=task_id).select_related('uploaded_by')
+        attachments = Attachment.objects.filter(
+            task_id=task_id, **member_filter(request.user, 'task__board'),
+        ).select_related('uploaded_by')
         serializer = AttachmentSerializer(attachments, many=True)
         return Response({"success": True, "data": serializer.data})
 
@@ -290,7 +615,7 @@ class TaskAttachmentListCreateView(APIView):
             return Response({"error": "File is required."}, status=400)
 
         try:
-            task = Task.objects.get(pk=task_id)
+            task = Task.objects.get(pk=task_id, **member_filter(request.user))
         except Task.DoesNotExist:
             return Response({"error": "Task not found."}, status=404)
 
@@ -308,7 +633,7 @@ class AttachmentDeleteView(APIView):
 
     def delete(self, request, pk):
         try:
-            attachment = Attachment.objects.get(pk=pk)
+            attachment = Attachment.objects.get(pk=pk, **member_filter(request.user, 'task__board'))
         except Attachment.DoesNotExist:
             return Response({"error": "Attachment not found."}, status=404)
 
@@ -321,134 +646,254 @@ class AttachmentDeleteView(APIView):
 
 class AttachmentDownloadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_cost = 3
 
     def get(self, request, pk):
-        try:
-            attachment = Attachment.objects.get(pk=pk)
-        except Attachment.DoesNotExist:
+        # Archiving keeps attachment ids and files, so archived attachments download here too.
+        attachment = (
+            Attachment.objects.filter(pk=pk, **member_filter(request.user, 'task__board')).first()
+            or ArchivedAttachment.objects.filter(pk=pk, **member_filter(request.user, 'task__board')).first()
+        )
+        if attachment is None:
             raise Http404
 
         response = FileResponse(attachment.file.open('rb'), as_attachment=True, filename=attachment.original_name)
         return response
     
-class DashboardStatsView(APIView):
-    permission_classes = [IsAuthenticated]
+def archived_task_count(board_id):
+    return StatCounter.value_of(archived_counter(board_id))
+
+
+def dashboard_stat_queries(board_id):
+    """
+    One board's dashboard figures, each as a list of independent counting
+    callables whose results add up to the figure. Archived tasks (all done)
+    come from the board's StatCounter total or the archive table's indexes.
+    """
+    today = now().date()
+    week_start = start_of_week(today)
+    tasks = Task.objects.filter(board_id=board_id)
+    archived = ArchivedTask.objects.filter(board_id=board_id)
+    archived_total = lambda: archived_task_count(board_id)
+    return {
+        "totalTasks": [tasks.count, archived_total],
+        "todoTasks": [tasks.filter(status='todo').count],
+        "inProgressTasks": [tasks.filter(status='inprogress').count],
+        "doneTasks": [tasks.filter(status='done').count, archived_total],
+        "overdueTasks": [tasks.filter(due_date__lt=today).exclude(status='done').count],
+        "totalUsers": [BoardMembership.objects.filter(board_id=board_id).count],
+        # Compare against a datetime rather than using __date so the indexes apply.
+        "tasksThisWeek": [
+            tasks.filter(created_at__gte=week_start).count,
+            archived.filter(created_at__gte=week_start).count,
+        ],
+        "completedThisWeek": [
+            tasks.filter(status='done', updated_at__gte=week_start).count,
+            archived.filter(updated_at__gte=week_start).count,
+        ],
+    }
+
+
+def recent_activity_queryset(board_id):
+    logs = ActivityLog.objects.filter(board_id=board_id).select_related('user')
+    return with_task_titles(logs).order_by('-created_at')[:20]
 
-    def get(self, request):
-        today = now().date()
-        week_start = today - timedelta(days=today.weekday())
 
-        total_tasks = Task.objects.count()
-        todo = Task.objects.filter(status='todo').count()
-        inprogress = Task.objects.filter(status='inprogress').count()
-        done = Task.objects.filter(status='done').count()
-        overdue = Task.objects.filter(due_date__lt=today).exclude(status='done').count()
-        tasks_this_week = Task.objects.filter(created_at__date__gte=week_start).count()
-        completed_this_week = Task.objects.filter(status='done', updated_at__date__gte=week_start).count()
-        total_users = CustomUser.objects.count()
+def task_status_rows(board_id):
+    return Task.objects.filter(board_id=board_id).values('status').annotate(count=Count('id')).order_by()
 
+
+def status_counts(rows, archived=0):
+    result = {item['status']: item['count'] for item in rows}
+    return {
+        "todo": result.get("todo", 0),
+        "inprogress": result.get("inprogress", 0),
+        "done": result.get("done", 0) + archived
+    }
+
+
+def task_search_queryset(board_id, query='', status=None, assignee=None, label_ids=(), label_match=LABEL_MATCH_ANY):
+    tasks = Task.objects.select_related('assignee').prefetch_related('labels').filter(board_id=board_id)
+    if query:
+        tasks = tasks.filter(Q(title__icontains=query) | Q(description__icontains=query))
+    if status:
+        tasks = tasks.filter(status=status)
+    if assignee:
+        tasks = tasks.filter(assignee__id=assignee)
+    return filter_by_labels(tasks, label_ids, label_match)
+
+
+def user_search_queryset(board_id, query=''):
+    members = CustomUser.objects.filter(board_memberships__board_id=board_id)
+    return members.filter(Q(username__icontains=query) | Q(email__icontains=query))
+
+
+class DashboardStatsView(ConcurrencyLimitMixin, ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_cost = 3
+
+    def get(self, request):
+        counts = dashboard_stat_queries(resolve_board(request))
         return Response({
             "success": True,
-            "data": {
-                "totalTasks": total_tasks,
-                "todoTasks": todo,
-                "inProgressTasks": inprogress,
-                "doneTasks": done,
-                "overdueTasks": overdue,
-                "totalUsers": total_users,
-                "tasksThisWeek": tasks_this_week,
-                "completedThisWeek": completed_this_week,
-            }
+            "data": {name: sum(count() for count in parts) for name, parts in counts.items()}
         })
 
 
-class DashboardActivityView(APIView):
+class DashboardActivityView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    throttle_cost = 2
 
     def get(self, request):
-        logs = ActivityLog.objects.select_related('user', 'task').order_by('-created_at')[:20]
+        logs = recent_activity_queryset(resolve_board(request))
         serializer = ActivityLogSerializer(logs, many=True)
         return Response({"success": True, "data": serializer.data})
 
 
-class TaskAnalyticsView(APIView):
+class TaskAnalyticsView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    throttle_cost = 2
 
     def get(self, request):
-        data = Task.objects.values('status').annotate(count=Count('id'))
-        result = {item['status']: item['count'] for item in data}
+        board_id = resolve_board(request)
+        data = task_status_rows(board_id)
+        return Response({"success": True, "data": status_counts(data, archived_task_count(board_id))})
+    
+
+class FlowAnalyticsView(ConcurrencyLimitMixin, ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_cost = 5
+    max_days = 366
+
+    def get(self, request):
+        today = now().date()
+        try:
+            end = parse_date(request.GET['to']) if request.GET.get('to') else today
+            start = parse_date(request.GET['from']) if request.GET.get('from') else end - timedelta(days=29)
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            return Response({"error": "from/to must be dates (YYYY-MM-DD)"}, status=400)
+        if start > end or (end - start).days >= self.max_days:
+            return Response({"error": f"from must be on or before to, at most {self.max_days} days apart"}, status=400)
+
+        board_id = resolve_board(request)
+        group_by = request.GET.get('groupBy', 'all')
+        if group_by not in dict(FlowDailyRollup.DIMENSIONS):
+            return Response({"error": "groupBy must be one of all, assignee, label"}, status=400)
+
         return Response({
             "success": True,
             "data": {
-                "todo": result.get("todo", 0),
-                "inprogress": result.get("inprogress", 0),
-                "done": result.get("done", 0)
+                "from": start,
+                "to": end,
+                "board": board_id,
+                "groupBy": group_by,
+                "series": flow_metrics(board_id, group_by, start, end),
             }
         })
-    
 
-class TaskSearchView(APIView):
+
+class TaskSearchView(ConcurrencyLimitMixin, ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    throttle_cost = 5
 
     def get(self, request):
         query = request.GET.get('q', '')
         status = request.GET.get('status')
         assignee = request.GET.get('assignee')
-        label_ids = request.GET.get('labels', '').split(',') if request.GET.get('labels') else []
+        label_ids = parse_id_list(request.GET.get('labels'))
+        label_match = request.GET.get('labelMatch', LABEL_MATCH_ANY)
+        board_id = resolve_board(request)
+
+        serializer = TaskSerializer(context={'request': request})
+        tasks = serializer.narrow_queryset(
+            task_search_queryset(board_id, query, status, assignee, label_ids, label_match)
+        )
+        tasks = list(tasks)
+        if wants_archived(request.GET):
+            tasks += serializer.narrow_queryset(
+                archived_task_search_queryset(board_id, query, status, assignee, label_ids, label_match)
+            )
+
+        data = {
+            "tasks": TaskSerializer(tasks, many=True, context={'request': request}).data,
+            "totalResults": len(tasks),
+            "searchQuery": query,
+            "filters": {
+                "status": [status] if status else [],
+                "labels": label_ids,
+                "labelMatch": label_match,
+                "assignee": assignee
+            }
+        }
+        if serializer.render_label_ids:
+            data["labels"] = label_dictionary(tasks)
+        return Response({"success": True, "data": data})
 
-        tasks = Task.objects.select_related('assignee').prefetch_related('labels').all()
 
-        if query:
-            tasks = tasks.filter(Q(title__icontains=query) | Q(description__icontains=query))
-        if status:
-            tasks = tasks.filter(status=status)
-        if assignee:
-            tasks = tasks.filter(assignee__id=assignee)
-        if label_ids:
-            tasks = tasks.filter(labels__id__in=label_ids).distinct()
+class UserSearchView(ConcurrencyLimitMixin, ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_cost = 3
+    default_limit = 50
+    max_limit = 200
 
-        serializer = TaskSerializer(tasks, many=True)
+    def get(self, request):
+        query = request.GET.get('q', '')
+        limit = typeahead.parse_limit(request.GET.get('limit'), self.default_limit, self.max_limit)
+        users = list(user_search_queryset(resolve_board(request), query).order_by('id')[:limit])
+        serializer = UserSerializer(users, many=True)
         return Response({
             "success": True,
             "data": {
-                "tasks": serializer.data,
-                "totalResults": tasks.count(),
-                "searchQuery": query,
-                "filters": {
-                    "status": [status] if status else [],
-                    "labels": label_ids if label_ids else [],
-                    "assignee": assignee
-                }
+                "users": serializer.data,
+                "totalResults": len(users),
+                "searchQuery": query
             }
         })
 
 
-class UserSearchView(APIView):
+class TypeaheadView(ReplicaReadMixin, APIView):
+    """Ranked top-K matches for ?q=, at most typeahead.MAX_LIMIT (?limit=)."""
     permission_classes = [IsAuthenticated]
+    search = None
+    serializer_class = None
 
     def get(self, request):
         query = request.GET.get('q', '')
-        users = CustomUser.objects.filter(
-            Q(username__icontains=query) | Q(email__icontains=query)
-        )
-        serializer = UserSerializer(users, many=True)
+        limit = typeahead.parse_limit(request.GET.get('limit'))
+        results = self.search(resolve_board(request), query, limit)
         return Response({
             "success": True,
             "data": {
-                "users": serializer.data,
-                "totalResults": users.count(),
-                "searchQuery": query
+                "results": self.serializer_class(results, many=True).data,
+                "query": query,
+                "limit": limit
             }
         })
 
 
-class GlobalSearchView(APIView):
+class UserTypeaheadView(TypeaheadView):
+    search = staticmethod(typeahead.search_users)
+    serializer_class = UserSerializer
+
+
+class LabelTypeaheadView(TypeaheadView):
+    search = staticmethod(typeahead.search_labels)
+    serializer_class = LabelSerializer
+
+
+class GlobalSearchView(ConcurrencyLimitMixin, ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    throttle_cost = 8
 
     def get(self, request):
         query = request.GET.get('q', '')
-        task_qs = Task.objects.filter(Q(title__icontains=query) | Q(description__icontains=query))
-        user_qs = CustomUser.objects.filter(Q(username__icontains=query) | Q(email__icontains=query))
+        board_id = resolve_board(request)
+        task_qs = list(task_search_queryset(board_id, query))
+        if wants_archived(request.GET):
+            task_qs += archived_task_search_queryset(board_id, query)
+        user_qs = user_search_queryset(board_id, query)
 
         tasks = TaskSerializer(task_qs, many=True).data
         users = UserSerializer(user_qs, many=True).data
@@ -462,4 +907,17 @@ class GlobalSearchView(APIView):
                 "totalTaskResults": len(tasks),
                 "totalUserResults": len(users)
             }
-        })
\ No newline at end of file
+        })
+
+class MetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "success": True,
+            "data": {
+                "compression": compression.stats.snapshot(),
+                "throttling": throttling.stats.snapshot(),
+                "coldStart": warmup.stats.snapshot(),
+            }
+        })
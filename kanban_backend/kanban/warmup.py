@@ -0,0 +1,166 @@
+"""
+Worker start-up: doing the first-request work before the first request, and
+measuring how slow the first requests still are.
+
+``warm_up()`` runs once in the gunicorn master before it forks (see the
+``serve`` command), so every worker starts with the result: compiled URL
+patterns, model _meta caches and DRF imports filled in by building the
+serializers, the typeahead indexes, and one request through the whole
+middleware/DRF stack. Database connections must not cross a fork, so the
+master closes its own. Workers do not pre-open any: Django connections
+belong to the request thread that opens them and, with CONN_MAX_AGE 0 (the
+default, see KANBAN_DB_CONN_MAX_AGE), close after each request anyway.
+
+ColdStartStats (``stats``, filled in by ColdStartMiddleware) keeps this
+process's warm-up timings and the latency of its first COLD_START_REQUESTS
+requests next to the average of the requests after them; /api/metrics
+reports it for the worker that answers.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+
+from . import compression, typeahead
+from .serializers import (
+    ActivityLogSerializer, AttachmentSerializer, BoardSerializer, CommentSerializer,
+    LabelSerializer, TaskSerializer, UserSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+WARM_SERIALIZERS = (
+    TaskSerializer, LabelSerializer, UserSerializer, BoardSerializer,
+    CommentSerializer, AttachmentSerializer, ActivityLogSerializer,
+)
+
+
+class ColdStartStats:
+    """Warm-up step timings and first-request latencies for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.warmup = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pid = os.getpid()
+            self.booted_at = timezone.now()
+            self.first_requests = []
+            self.later_count = 0
+            self.later_ms = 0.0
+
+    def record(self, endpoint, duration_ms):
+        with self._lock:
+            if len(self.first_requests) < settings.COLD_START_REQUESTS:
+                self.first_requests.append({"endpoint": endpoint, "durationMs": round(duration_ms, 3)})
+                done = len(self.first_requests) == settings.COLD_START_REQUESTS
+            else:
+                self.later_count += 1
+                self.later_ms += duration_ms
+                done = False
+        if done:
+            logger.info("worker %s: first %d requests took %s ms", self.pid, len(self.first_requests),
+                        [entry['durationMs'] for entry in self.first_requests])
+
+    def snapshot(self):
+        with self._lock:
+            first = list(self.first_requests)
+            later_count, later_ms = self.later_count, self.later_ms
+        return {
+            "pid": self.pid,
+            "bootedAt": self.booted_at.isoformat(),
+            "warmupMs": dict(self.warmup),
+            "firstRequests": first,
+            "firstRequestMs": first[0]['durationMs'] if first else None,
+            "firstRequestsAvgMs": round(sum(entry['durationMs'] for entry in first) / len(first), 3) if first else None,
+            "laterRequests": later_count,
+            "laterRequestsAvgMs": round(later_ms / later_count, 3) if later_count else None,
+        }
+
+
+stats = ColdStartStats()
+
+
+def _timed(name, fn):
+    start = time.perf_counter()
+    fn()
+    stats.warmup[name] = round((time.perf_counter() - start) * 1000, 3)
+
+
+def _compile_urls(resolver=None):
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict  # builds the reverse lookup tables
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            _compile_urls(pattern)
+
+
+def _build_serializers():
+    for serializer_class in WARM_SERIALIZERS:
+        serializer_class().fields
+    for model in apps.get_models():
+        model._meta.get_fields()
+
+
+def _build_typeahead():
+    if connections['default'].vendor == 'postgresql':
+        return  # served by the trigram indexes instead
+    typeahead.user_index.warm()
+    typeahead.label_index.warm()
+
+
+def _host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+def _first_request(application):
+    # An anonymous task list with an unusable token: a quick 401 that still
+    # runs every middleware, JWT decoding, DRF's negotiation, exception
+    # handling and rendering. Its "Unauthorized" warning is expected.
+    request = RequestFactory().get(
+        '/api/tasks', HTTP_HOST=_host(), SERVER_NAME=_host(), HTTP_AUTHORIZATION='Bearer warm-up',
+    )
+    request_logger = logging.getLogger('django.request')
+    level = request_logger.level
+    request_logger.setLevel(logging.ERROR)
+    try:
+        application.get_response(request)
+    finally:
+        request_logger.setLevel(level)
+    compression.stats.reset()
+    stats.reset()
+
+
+def _connect():
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def warm_up(application):
+    """Warm `application` (a WSGIHandler) and this process's caches; returns the step timings in ms."""
+    stats.warmup.clear()
+    _timed('database', _connect)
+    _timed('urls', _compile_urls)
+    _timed('serializers', _build_serializers)
+    _timed('typeahead', _build_typeahead)
+    _timed('firstRequest', lambda: _first_request(application))
+    connections.close_all()
+    return dict(stats.warmup)
+
+
+def after_fork():
+    """Run in each new worker: start its cold-start record."""
+    stats.reset()
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,12 +49,23 @@ INSTALLED_APPS = [
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'kanban.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'DEFAULT_THROTTLE_CLASSES': ['kanban.throttling.TokenBucketThrottle'],
+    # Reverse proxies in front of the app. Throttles key anonymous clients on
+    # REMOTE_ADDR, or on the X-Forwarded-For entry this many hops back; with
+    # 0 a client cannot pick its own key by sending the header.
+    'NUM_PROXIES': int(os.environ.get('KANBAN_NUM_PROXIES', 0)),
 }
+
+# Per-process cache of authenticated users, keyed by the token's user id.
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = 30
+# Seconds between each worker's reads of the shared logout/user-change deny list.
+AUTH_REVOCATION_REFRESH = 1
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -70,16 +85,89 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'kanban.middleware.ColdStartMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'kanban.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'kanban.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'kanban.middleware.ReplicaStickinessMiddleware',
 ]
 
+# Response compression: encodings in order of preference (br/zstd are used only
+# when the brotli/zstandard packages are installed), and the smallest body worth compressing.
+COMPRESSION_ENCODINGS = ['br', 'zstd', 'gzip']
+COMPRESSION_MIN_SIZE = 1024
+# BREACH mitigation: responses under these path prefixes carry tokens and are never compressed,
+# and one-shot gzip bodies get up to COMPRESSION_MAX_RANDOM_BYTES of random header padding
+# (as django.middleware.gzip does). br/zstd have no padding; drop them from
+# COMPRESSION_ENCODINGS if responses that echo query input must not be length-comparable.
+COMPRESSION_EXCLUDE_PATHS = ['/api/auth/']
+COMPRESSION_MAX_RANDOM_BYTES = 100
+
+# archive_done_tasks moves tasks that have been done for longer than this into the archive tables.
+ARCHIVE_AFTER_DAYS = int(os.environ.get('KANBAN_ARCHIVE_AFTER_DAYS', 30))
+
+# Off PostgreSQL the user/label typeahead uses a per-process in-memory index,
+# rebuilt on changes and at least this often (seconds) to pick up other workers' writes.
+TYPEAHEAD_INDEX_TTL = 300
+
+# Request profiling (kanban.profiling): staff can always ask with "X-Profile: 1";
+# PROFILE_SAMPLE_RATE additionally profiles that fraction of all requests.
+PROFILE_SAMPLE_RATE = float(os.environ.get('KANBAN_PROFILE_SAMPLE_RATE', 0))
+PROFILE_SAMPLE_INTERVAL = 0.005
+# Outside the source tree so that profiles never end up in a commit.
+PROFILE_DIR = os.environ.get('KANBAN_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'kanban-profiles'))
+PROFILE_KEEP = 100
+
+# Caches. 'default' is per-process memory. 'shared' holds state every worker
+# has to agree on (read-after-write replica pins) and is Redis at
+# KANBAN_REDIS_URL. Without it 'shared' is per-process memory too, which only
+# holds for a single worker process: with a replica configured, run Redis
+# (the kanban.W001 check says so).
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'kanban-shared'},
+}
+if os.environ.get('KANBAN_REDIS_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['KANBAN_REDIS_URL'],
+    }
+SHARED_CACHE = 'shared'
+
+# Admission control (kanban.throttling). Each client gets a token bucket of
+# *_BURST tokens refilled at *_RATE tokens per second; a request spends its
+# view's throttle_cost. Search and analytics also count against in-flight
+# caps, per client and overall. Buckets are touched on every request, so they
+# stay in per-process memory unless Redis is configured for the shared cache.
+THROTTLE_CACHE = 'shared' if os.environ.get('KANBAN_REDIS_URL') else 'default'
+THROTTLE_USER_BURST = int(os.environ.get('KANBAN_THROTTLE_USER_BURST', 120))
+THROTTLE_USER_RATE = float(os.environ.get('KANBAN_THROTTLE_USER_RATE', 2))
+THROTTLE_ANON_BURST = int(os.environ.get('KANBAN_THROTTLE_ANON_BURST', 30))
+THROTTLE_ANON_RATE = float(os.environ.get('KANBAN_THROTTLE_ANON_RATE', 0.5))
+if min(THROTTLE_USER_RATE, THROTTLE_ANON_RATE) <= 0 or min(THROTTLE_USER_BURST, THROTTLE_ANON_BURST) < 1:
+    raise ImproperlyConfigured("KANBAN_THROTTLE_*_RATE must be above 0 and KANBAN_THROTTLE_*_BURST at least 1.")
+EXPENSIVE_REQUEST_LIMIT = int(os.environ.get('KANBAN_EXPENSIVE_REQUEST_LIMIT', 16))
+EXPENSIVE_REQUEST_CLIENT_LIMIT = 2
+EXPENSIVE_REQUEST_RETRY_AFTER = 2
+EXPENSIVE_REQUEST_TTL = 60
+
+# Production server (manage.py serve). 0 workers/threads means size them
+# from the CPU count.
+SERVER_BIND = os.environ.get('KANBAN_BIND', '0.0.0.0:8000')
+SERVER_WORKERS = int(os.environ.get('KANBAN_WORKERS', 0))
+SERVER_THREADS = int(os.environ.get('KANBAN_THREADS', 0))
+SERVER_TIMEOUT = 30
+SERVER_GRACEFUL_TIMEOUT = 30
+# Requests per process whose latency is reported as cold-start latency in /api/metrics.
+COLD_START_REQUESTS = 20
+
 CORS_ALLOW_ALL_ORIGINS = True
 # CORS_ALLOWED_ORIGINS = [
 #     'http://localhost:3000',
@@ -114,9 +202,34 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Seconds a worker thread keeps its connection between requests (0: reconnect per request).
+        'CONN_MAX_AGE': int(os.environ.get('KANBAN_DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Optional read replica. Locally this can be a second SQLite file kept in sync
+# by hand; under test it mirrors the default database.
+if os.environ.get('KANBAN_REPLICA_DB_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': os.environ.get('KANBAN_REPLICA_DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': os.environ['KANBAN_REPLICA_DB_NAME'],
+        'HOST': os.environ.get('KANBAN_REPLICA_DB_HOST', ''),
+        'PORT': os.environ.get('KANBAN_REPLICA_DB_PORT', ''),
+        'USER': os.environ.get('KANBAN_REPLICA_DB_USER', ''),
+        'PASSWORD': os.environ.get('KANBAN_REPLICA_DB_PASSWORD', ''),
+        'CONN_MAX_AGE': int(os.environ.get('KANBAN_DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['kanban.db_router.PrimaryReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Seconds a client keeps reading from the primary after one of its writes
+# (tracked in the shared cache, so it holds whichever worker serves the read).
+REPLICA_STICKY_SECONDS = int(os.environ.get('KANBAN_REPLICA_STICKY_SECONDS', 5))
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -140,6 +253,23 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing profile. "default" keeps Django's hashers; "fast" trades
+# some brute-force resistance for login throughput (PBKDF2 at
+# PASSWORD_HASHER_ITERATIONS rounds). Existing hashes keep working under
+# either profile and are re-encoded on the next successful login.
+PASSWORD_HASHER_PROFILE = os.environ.get('KANBAN_PASSWORD_HASHER_PROFILE', 'default')
+PASSWORD_HASHER_ITERATIONS = int(os.environ.get('KANBAN_PASSWORD_HASHER_ITERATIONS', 150000))
+
+if PASSWORD_HASHER_PROFILE == 'fast':
+    PASSWORD_HASHERS = [
+        'kanban.hashers.TunedPBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -2,8 +2,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from kanban.admin import profiling_urls
 
 urlpatterns = [
+    path('admin/profiles/', include(profiling_urls)),
     path('admin/', admin.site.urls),
     path('',include('kanban.urls'))
 ]